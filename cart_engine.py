@@ -6,35 +6,76 @@ Version 2: Simplified and more robust approach.
 
 import logging
 import re
+from collections import Counter, OrderedDict, deque
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Dict, List, Optional, Set, Tuple
 from menu_data import Menu, MenuItem, get_menu
 
+try:
+    # Optional RE2 engine (google-re2): linear-time DFA matching for size scans
+    import re2 as _size_regex
+except ImportError:
+    _size_regex = re
+
 
 logger = logging.getLogger(__name__)
 
+# Quantity words recognised before an item mention
+QUANTITY_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+    "a": 1, "an": 1
+}
 
-@dataclass
+# Alias sets up to this size are scanned with str.find instead of the DFA
+FIND_SCAN_MAX_ALIASES = 32
+
+# Maximum number of (sku, context) entries kept by CartNormalizer
+CONTEXT_CACHE_SIZE = 4096
+
+# Correction phrases that don't affect item identification
+_CORRECTION_RE = re.compile(r'\b(?:actually|instead|change|make that|switch)\b', re.IGNORECASE)
+# Punctuation except hyphens and apostrophes
+_PUNCT_RE = re.compile(r"[^\w\s\-']")
+# Same mapping as a translate table for the common all-ASCII case
+_PUNCT_TABLE = str.maketrans({c: ' ' for c in map(chr, range(128)) if _PUNCT_RE.match(c)})
+
+
+@dataclass(slots=True)
 class CartItem:
-    """Represents a single item in the cart."""
+    """
+    Represents a single item in the cart.
+    The modifiers list is shared, not copied, when items are merged; assign a
+    new list instead of mutating it in place.
+    """
     sku: str
     name: str
     quantity: int = 1
     size: Optional[str] = None
     modifiers: List[str] = field(default_factory=list)
     price: float = 0.0
+    _key: Optional[Tuple] = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def key(self) -> Tuple:
+        """
+        Identity key (sku, size, sorted modifiers), computed on first use.
+        Size and modifiers are treated as fixed once the key has been read.
+        """
+        if self._key is None:
+            self._key = (self.sku, self.size, tuple(sorted(self.modifiers)))
+        return self._key
     
     def __hash__(self):
         """Make CartItem hashable for duplicate detection."""
-        return hash((self.sku, self.size, tuple(sorted(self.modifiers))))
+        return hash(self.key)
     
     def __eq__(self, other):
         """Check if two cart items are identical."""
         if not isinstance(other, CartItem):
             return False
-        return (self.sku == other.sku and 
-                self.size == other.size and 
-                set(self.modifiers) == set(other.modifiers))
+        return self.key == other.key
 
 
 @dataclass
@@ -63,23 +104,19 @@ class Cart:
             self.total += item.price * item.quantity
     
     def merge_duplicates(self):
-        """Merge duplicate items in the cart."""
-        merged = {}
+        """
+        Merge duplicate items in the cart.
+        The first occurrence of each item is kept and absorbs later quantities.
+        Merging only regroups units, so the running total stays correct.
+        """
+        merged: Dict[Tuple, CartItem] = {}
         for item in self.items:
-            key = (item.sku, item.size, tuple(sorted(item.modifiers)))
+            key = item.key
             if key in merged:
                 merged[key].quantity += item.quantity
             else:
-                merged[key] = CartItem(
-                    sku=item.sku,
-                    name=item.name,
-                    quantity=item.quantity,
-                    size=item.size,
-                    modifiers=item.modifiers.copy(),
-                    price=item.price
-                )
+                merged[key] = item
         self.items = list(merged.values())
-        self.total = sum(item.price * item.quantity for item in self.items)
     
     def to_dict(self) -> Dict:
         """Convert cart to dictionary for JSON serialization."""
@@ -99,6 +136,115 @@ class Cart:
         }
 
 
+def _is_word_char(ch: str) -> bool:
+    """Match the definition of \\w used by the re module."""
+    return ch.isalnum() or ch == '_'
+
+
+class AliasAutomaton:
+    """
+    Aho-Corasick automaton over menu aliases.
+    Reports every alias occurrence in a single pass over the text, optionally
+    restricted to word boundaries. Failure links are folded into a flat DFA
+    transition table, so scanning costs one dict lookup per character.
+    Small alias sets are cheaper to scan alias-by-alias with str.find, so
+    matches may be yielded in any order.
+    """
+    
+    def __init__(self, aliases: List[str], word_bounded: bool = True):
+        self.word_bounded = word_bounded
+        self._aliases = tuple((alias, len(alias)) for alias in dict.fromkeys(aliases))
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+        self._delta: List[Dict[str, int]] = []
+        for alias in aliases:
+            self._add(alias)
+        self._link()
+        # Scanning only needs the DFA table and per-state (alias, length) outputs
+        self._matches: List[Tuple[Tuple[str, int], ...]] = [
+            tuple((alias, len(alias)) for alias in out) for out in self._out
+        ]
+        del self._goto, self._fail, self._out
+    
+    def _add(self, alias: str):
+        """Insert an alias into the trie."""
+        state = 0
+        for ch in alias:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = next_state
+        self._out[state].append(alias)
+    
+    def _link(self):
+        """Compute failure links, merged outputs and DFA transitions breadth-first."""
+        self._delta = [{} for _ in self._goto]
+        self._delta[0] = dict(self._goto[0])
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            # The failure state is shallower, so its transitions are already complete
+            self._delta[state] = {**self._delta[self._fail[state]], **self._goto[state]}
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+    
+    def iter(self, text: str):
+        """Yield (start, end, alias) for each alias occurrence in the text."""
+        if len(self._aliases) <= FIND_SCAN_MAX_ALIASES:
+            return self._find_scan(text)
+        return self._dfa_scan(text)
+    
+    def _is_bounded(self, text: str, start: int, end: int) -> bool:
+        """Check that a match sits on word boundaries (if required)."""
+        if not self.word_bounded:
+            return True
+        if start > 0 and _is_word_char(text[start - 1]):
+            return False
+        return end == len(text) or not _is_word_char(text[end])
+    
+    def _find_scan(self, text: str):
+        """Scan alias-by-alias with str.find."""
+        for alias, alias_length in self._aliases:
+            start = text.find(alias)
+            while start != -1:
+                end = start + alias_length
+                if self._is_bounded(text, start, end):
+                    yield start, end, alias
+                start = text.find(alias, start + 1)
+    
+    def _dfa_scan(self, text: str):
+        """Scan character-by-character through the DFA."""
+        delta, matches = self._delta, self._matches
+        word_bounded = self.word_bounded
+        length = len(text)
+        state = 0
+        for i, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            if not matches[state]:
+                continue
+            end = i + 1
+            for alias, alias_length in matches[state]:
+                start = end - alias_length
+                if not word_bounded:
+                    yield start, end, alias
+                    continue
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if end < length and _is_word_char(text[end]):
+                    continue
+                yield start, end, alias
+
+
 class CartNormalizer:
     """
     Normalizes user input into structured cart items.
@@ -108,6 +254,10 @@ class CartNormalizer:
     def __init__(self, menu: Menu):
         self.menu = menu
         self._build_indexes()
+        # Parsing is deterministic for a given menu, so memoize on the input text
+        self._parse_items_cached = lru_cache(maxsize=1024)(self._parse_items)
+        # (sku, context) -> (size, modifiers, price), evicted oldest-first
+        self._context_cache: OrderedDict = OrderedDict()
     
     def _build_indexes(self):
         """Build search indexes for fast lookup."""
@@ -119,15 +269,32 @@ class CartNormalizer:
             # Add aliases
             for alias in item.aliases:
                 self.alias_map[alias.lower()] = item
+        self.alias_automaton = AliasAutomaton(list(self.alias_map))
         
         # Size synonym mapping
         self.size_map = self.menu.size_synonyms.copy()
+        # Single alternation over all size words (longest first); the rank
+        # keeps the menu's synonym order as the tie-breaker between matches
+        self._size_rank = {size_word: rank for rank, size_word in enumerate(self.size_map)}
+        self._size_re = _size_regex.compile(
+            r'\b(' + '|'.join(re.escape(w) for w in sorted(self.size_map, key=len, reverse=True)) + r')\b'
+        )
         
         # Modifier synonym mapping
         self.modifier_map: Dict[str, str] = {}
         for item in self.menu.items:
             for synonym, canonical in item.modifier_synonyms.items():
                 self.modifier_map[synonym.lower()] = canonical
+        # Each item's explicit modifiers paired with their lowercase form
+        self._item_modifiers: Dict[str, Tuple[Tuple[str, str], ...]] = {
+            item.sku: tuple((modifier, modifier.lower()) for modifier in item.modifiers)
+            for item in self.menu.items
+        }
+        # One substring automaton over modifier synonyms and explicit modifiers
+        modifier_phrases = dict.fromkeys(self.modifier_map)
+        for item_modifiers in self._item_modifiers.values():
+            modifier_phrases.update(dict.fromkeys(modifier_lower for _, modifier_lower in item_modifiers))
+        self.modifier_automaton = AliasAutomaton(list(modifier_phrases), word_bounded=False)
     
     def normalize_text(self, text: str) -> str:
         """
@@ -135,7 +302,10 @@ class CartNormalizer:
         Removes punctuation, normalizes whitespace, converts to lowercase.
         """
         # Remove punctuation except hyphens and apostrophes
-        text = re.sub(r'[^\w\s\-\']', ' ', text)
+        if text.isascii():
+            text = text.translate(_PUNCT_TABLE)
+        else:
+            text = _PUNCT_RE.sub(' ', text)
         # Normalize whitespace
         text = ' '.join(text.split())
         return text.lower()
@@ -147,6 +317,26 @@ class CartNormalizer:
         """
         logger.info(f"Parsing order: {text}")
         
+        # Build a fresh cart from the memoized parse so callers can mutate it
+        cart = Cart()
+        for sku, name, quantity, size, modifiers, price in self._parse_items_cached(text):
+            cart.add_item(CartItem(
+                sku=sku,
+                name=name,
+                quantity=quantity,
+                size=size,
+                modifiers=list(modifiers),
+                price=price
+            ))
+        logger.info(f"Final cart: {cart.to_dict()}")
+        
+        return cart
+    
+    def _parse_items(self, text: str) -> Tuple[Tuple, ...]:
+        """
+        Parse order text into immutable item tuples.
+        Returns (sku, name, quantity, size, modifiers, price) per merged item.
+        """
         # Handle corrections
         text = self._handle_corrections(text)
         
@@ -164,9 +354,11 @@ class CartNormalizer:
         
         # Merge duplicates
         cart.merge_duplicates()
-        logger.info(f"Final cart: {cart.to_dict()}")
         
-        return cart
+        return tuple(
+            (item.sku, item.name, item.quantity, item.size, tuple(item.modifiers), item.price)
+            for item in cart.items
+        )
     
     def _handle_corrections(self, text: str) -> str:
         """
@@ -174,49 +366,31 @@ class CartNormalizer:
         Examples: "make that medium", "cancel the fries", "switch Coke to Diet"
         """
         # Remove correction phrases that don't affect item identification
-        corrections = [
-            r'\bactually\b',
-            r'\binstead\b',
-            r'\bchange\b',
-            r'\bmake that\b',
-            r'\bswitch\b',
-        ]
-        
-        for pattern in corrections:
-            text = re.sub(pattern, '', text, flags=re.IGNORECASE)
-        
-        return text
+        return _CORRECTION_RE.sub('', text)
     
     def _find_all_items(self, text: str) -> List[CartItem]:
         """Find all items mentioned in the text."""
         items = []
         
         # Find all potential item mentions with their positions
-        found_mentions = []
-        for alias, item in self.alias_map.items():
-            # Find all occurrences of this alias
-            for match in re.finditer(r'\b' + re.escape(alias) + r'\b', text):
-                found_mentions.append((match.start(), match.end(), alias, item))
+        found_mentions = [
+            (start, end, alias, self.alias_map[alias])
+            for start, end, alias in self.alias_automaton.iter(text)
+        ]
         
-        # Sort by position
-        found_mentions.sort(key=lambda x: x[0])
+        # Sort by position, longest mention first at the same start
+        found_mentions.sort(key=lambda x: (x[0], x[0] - x[1]))
         
-        # Remove overlapping mentions (keep the longest)
+        # Remove overlapping mentions (keep the longest) in a single sweep.
+        # Accepted mentions never overlap each other, so only the last one can
+        # overlap the next mention in start order.
         filtered_mentions = []
-        for i, mention in enumerate(found_mentions):
+        for mention in found_mentions:
             start, end, alias, item = mention
-            # Check if this mention overlaps with any previous
-            overlaps = False
-            for prev_start, prev_end, prev_alias, prev_item in filtered_mentions:
-                if not (end <= prev_start or start >= prev_end):
-                    # Overlaps - keep the longer one
-                    if len(alias) > len(prev_alias):
-                        filtered_mentions.remove((prev_start, prev_end, prev_alias, prev_item))
-                    else:
-                        overlaps = True
-                        break
-            if not overlaps:
+            if not filtered_mentions or start >= filtered_mentions[-1][1]:
                 filtered_mentions.append(mention)
+            elif len(alias) > len(filtered_mentions[-1][2]):
+                filtered_mentions[-1] = mention
         
         # For each mention, extract its context and create a cart item
         for start, end, alias, item in filtered_mentions:
@@ -228,14 +402,8 @@ class CartNormalizer:
             # Extract quantity (look before the item)
             quantity = self._extract_quantity(context, alias)
             
-            # Extract size
-            size = self._extract_size(context, item)
-            
-            # Extract modifiers
-            modifiers = self._extract_modifiers(context, item)
-            
-            # Calculate price
-            price = self._calculate_price(item, size, modifiers)
+            # Extract size, modifiers and price (memoized per item and context)
+            size, modifiers, price = self._extract_details(context, item)
             
             # Create cart item
             cart_item = CartItem(
@@ -251,28 +419,32 @@ class CartNormalizer:
         
         return items
     
+    def _extract_details(self, context: str, item: MenuItem) -> Tuple[Optional[str], List[str], float]:
+        """Extract size, modifiers and price for an item, using the context cache."""
+        key = (item.sku, context)
+        cached = self._context_cache.get(key)
+        if cached is None:
+            size = self._extract_size(context, item)
+            modifiers = self._extract_modifiers(context, item)
+            price = self._calculate_price(item, size, modifiers)
+            cached = (size, tuple(modifiers), price)
+            self._context_cache[key] = cached
+            if len(self._context_cache) > CONTEXT_CACHE_SIZE:
+                self._context_cache.popitem(last=False)
+        size, modifiers, price = cached
+        return size, list(modifiers), price
+    
     def _extract_quantity(self, context: str, alias: str) -> int:
         """Extract quantity from context."""
-        # Number words
-        number_words = {
-            "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
-            "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
-            "a": 1, "an": 1
-        }
-        
         # Find the position of the alias in context
         alias_pos = context.find(alias)
         if alias_pos == -1:
             return 1
         
-        # Look backwards from alias for quantity
-        before_alias = context[:alias_pos]
-        words = before_alias.split()
-        
-        # Check last few words for quantity
-        for word in reversed(words[-5:]):
-            if word in number_words:
-                return number_words[word]
+        # Check the last few words before the alias for a quantity
+        for word in reversed(context[:alias_pos].rsplit(None, 5)[-5:]):
+            if word in QUANTITY_WORDS:
+                return QUANTITY_WORDS[word]
             if word.isdigit():
                 return int(word)
         
@@ -284,9 +456,9 @@ class CartNormalizer:
             return None
         
         # Look for size synonyms in context with word boundaries
-        for size_word, canonical_size in self.size_map.items():
-            if re.search(r'\b' + re.escape(size_word) + r'\b', context):
-                return canonical_size
+        size_words = self._size_re.findall(context)
+        if size_words:
+            return self.size_map[min(size_words, key=self._size_rank.__getitem__)]
         
         # Apply default size
         return self.menu.default_sizes.get(item.category, "medium")
@@ -296,15 +468,18 @@ class CartNormalizer:
         modifiers = []
         found = set()
         
+        # Collect every modifier phrase present in the context in one pass
+        phrases = {phrase for _, _, phrase in self.modifier_automaton.iter(context)}
+        
         # Check for modifier synonyms
         for synonym, canonical in self.modifier_map.items():
-            if synonym in context and canonical not in found:
+            if synonym in phrases and canonical not in found:
                 modifiers.append(canonical)
                 found.add(canonical)
         
         # Check for explicit modifiers
-        for modifier in item.modifiers:
-            if modifier.lower() in context and modifier not in found:
+        for modifier, modifier_lower in self._item_modifiers[item.sku]:
+            if modifier_lower in phrases and modifier not in found:
                 modifiers.append(modifier)
                 found.add(modifier)
         
@@ -332,14 +507,11 @@ class CartEvaluator:
         if len(actual.items) != len(expected.items):
             return False
         
-        actual_items = sorted(actual.items, key=lambda x: (x.sku, x.size, tuple(x.modifiers)))
-        expected_items = sorted(expected.items, key=lambda x: (x.sku, x.size, tuple(x.modifiers)))
+        actual_items = sorted(actual.items, key=lambda x: x.key)
+        expected_items = sorted(expected.items, key=lambda x: x.key)
         
         for a, e in zip(actual_items, expected_items):
-            if (a.sku != e.sku or 
-                a.quantity != e.quantity or
-                a.size != e.size or
-                set(a.modifiers) != set(e.modifiers)):
+            if a.key != e.key or a.quantity != e.quantity:
                 return False
         
         return True
@@ -348,24 +520,26 @@ class CartEvaluator:
     def calculate_f1(actual: Cart, expected: Cart) -> float:
         """
         Calculate F1 score for cart items.
-        Treats each item as a separate entity (SKU + size + modifiers).
+        Treats each unit as a separate entity (SKU + size + modifiers), so
+        quantities count towards precision and recall.
         """
-        actual_items = set()
+        actual_items = Counter()
         for item in actual.items:
-            for _ in range(item.quantity):
-                actual_items.add((item.sku, item.size, tuple(sorted(item.modifiers))))
+            actual_items[item.key] += item.quantity
         
-        expected_items = set()
+        expected_items = Counter()
         for item in expected.items:
-            for _ in range(item.quantity):
-                expected_items.add((item.sku, item.size, tuple(sorted(item.modifiers))))
+            expected_items[item.key] += item.quantity
+        
+        # Drop zero-quantity entries so they behave like absent items
+        actual_items, expected_items = +actual_items, +expected_items
         
         if not expected_items:
             return 1.0 if not actual_items else 0.0
         
-        true_positives = len(actual_items & expected_items)
-        false_positives = len(actual_items - expected_items)
-        false_negatives = len(expected_items - actual_items)
+        true_positives = sum((actual_items & expected_items).values())
+        false_positives = sum((actual_items - expected_items).values())
+        false_negatives = sum((expected_items - actual_items).values())
         
         precision = true_positives / (true_positives + false_positives) if (true_positives + false_positives) > 0 else 0
         recall = true_positives / (true_positives + false_negatives) if (true_positives + false_negatives) > 0 else 0
@@ -377,17 +551,19 @@ class CartEvaluator:
     @staticmethod
     def calculate_item_accuracy(actual: Cart, expected: Cart) -> float:
         """Calculate accuracy for item SKUs only (ignoring size and modifiers)."""
-        actual_skus = []
+        actual_skus = Counter()
         for item in actual.items:
-            actual_skus.extend([item.sku] * item.quantity)
+            actual_skus[item.sku] += item.quantity
         
-        expected_skus = []
+        expected_skus = Counter()
         for item in expected.items:
-            expected_skus.extend([item.sku] * item.quantity)
+            expected_skus[item.sku] += item.quantity
+        
+        # Drop zero-quantity entries so they behave like absent items
+        actual_skus, expected_skus = +actual_skus, +expected_skus
         
         if not expected_skus:
             return 1.0 if not actual_skus else 0.0
         
-        correct = sum(1 for a, e in zip(sorted(actual_skus), sorted(expected_skus)) if a == e)
-        return correct / len(expected_skus)
-
+        correct = sum((actual_skus & expected_skus).values())
+        return correct / sum(expected_skus.values())
@@ -7,10 +7,11 @@ import argparse
 import json
 import logging
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, Iterator, List, Tuple
 
-from cart_engine import CartEvaluator, CartNormalizer
+from cart_engine import Cart, CartEvaluator, CartNormalizer
 from menu_data import get_menu
 from test_scenarios import TestScenario, get_all_scenarios, get_scenarios_by_menu
 
@@ -21,17 +22,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# One normalizer per menu so indexes and the parse cache are shared across scenarios
+_normalizers: Dict[str, CartNormalizer] = {}
+
+
+def get_normalizer(menu_name: str) -> CartNormalizer:
+    """Get the cached normalizer for a menu, building it on first use."""
+    if menu_name not in _normalizers:
+        _normalizers[menu_name] = CartNormalizer(get_menu(menu_name))
+    return _normalizers[menu_name]
+
 
 class EvaluationReport:
-    """Stores evaluation results and generates reports."""
+    """
+    Streams evaluation results to a JSON Lines file and generates reports.
+    Only per-scenario metrics (and full records of failures) are kept in memory.
+    """
     
-    def __init__(self):
+    def __init__(self, results_path: str):
+        self.results_path = results_path
+        self._results_file = open(results_path, 'w')
         self.results: List[Dict] = []
+        self.failures: List[Dict] = []
         self.summary: Dict = {}
     
     def add_result(self, scenario: TestScenario, actual_cart, metrics: Dict):
-        """Add a result for a scenario."""
-        self.results.append({
+        """Write a scenario's result to the results file and record its metrics."""
+        record = {
             "scenario_id": scenario.id,
             "description": scenario.description,
             "menu": scenario.menu,
@@ -39,7 +56,20 @@ class EvaluationReport:
             "expected": scenario.expected_cart.to_dict(),
             "actual": actual_cart.to_dict(),
             "metrics": metrics
+        }
+        self._results_file.write(json.dumps(record) + "\n")
+        
+        self.results.append({
+            "scenario_id": scenario.id,
+            "menu": scenario.menu,
+            "metrics": metrics
         })
+        if not metrics["exact_match"]:
+            self.failures.append(record)
+    
+    def close(self):
+        """Flush and close the results file."""
+        self._results_file.close()
     
     def calculate_summary(self):
         """Calculate summary statistics."""
@@ -71,11 +101,11 @@ class EvaluationReport:
         }
     
     def to_json(self) -> str:
-        """Convert report to JSON."""
+        """Convert the report summary to JSON."""
         return json.dumps({
             "timestamp": datetime.now().isoformat(),
             "summary": self.summary,
-            "results": self.results
+            "results_file": self.results_path
         }, indent=2)
     
     def print_summary(self):
@@ -106,7 +136,7 @@ class EvaluationReport:
     
     def print_failures(self):
         """Print details of failed scenarios."""
-        failures = [r for r in self.results if not r["metrics"]["exact_match"]]
+        failures = self.failures
         
         if not failures:
             print("\n✅ All scenarios passed!")
@@ -126,7 +156,41 @@ class EvaluationReport:
             print("-"*80)
 
 
-def run_evaluation(menu_name: str = None, scenario_ids: List[str] = None, verbose: bool = False):
+def evaluate_scenario(scenario: TestScenario) -> Tuple[Cart, Dict]:
+    """Parse a single scenario and score it against the expected cart."""
+    logger.info(f"\nRunning scenario: {scenario.id}")
+    
+    # Get normalizer for this menu
+    normalizer = get_normalizer(scenario.menu)
+    
+    # Parse order
+    try:
+        actual_cart = normalizer.parse_order(scenario.input_text)
+    except Exception as e:
+        logger.error(f"Error parsing scenario {scenario.id}: {e}")
+        actual_cart = Cart()
+    
+    # Calculate metrics
+    metrics = {
+        "exact_match": CartEvaluator.exact_match(actual_cart, scenario.expected_cart),
+        "f1": CartEvaluator.calculate_f1(actual_cart, scenario.expected_cart),
+        "item_accuracy": CartEvaluator.calculate_item_accuracy(actual_cart, scenario.expected_cart)
+    }
+    
+    return actual_cart, metrics
+
+
+def iter_outcomes(scenarios: List[TestScenario], workers: int = None) -> Iterator[Tuple[Cart, Dict]]:
+    """Yield (actual_cart, metrics) per scenario, in order, as they complete."""
+    if workers == 1:
+        yield from map(evaluate_scenario, scenarios)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(evaluate_scenario, scenarios, chunksize=8)
+
+
+def run_evaluation(menu_name: str = None, scenario_ids: List[str] = None, verbose: bool = False,
+                   workers: int = None):
     """
     Run evaluation on test scenarios.
     
@@ -134,6 +198,7 @@ def run_evaluation(menu_name: str = None, scenario_ids: List[str] = None, verbos
         menu_name: "small", "large", or None for all
         scenario_ids: List of specific scenario IDs to run, or None for all
         verbose: Print detailed logs
+        workers: Worker processes to use (None for all CPUs, 1 to run in-process)
     """
     if verbose:
         logging.getLogger().setLevel(logging.DEBUG)
@@ -149,41 +214,23 @@ def run_evaluation(menu_name: str = None, scenario_ids: List[str] = None, verbos
     
     logger.info(f"Running {len(scenarios)} scenarios")
     
-    report = EvaluationReport()
+    output_file = f"evaluation_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    report = EvaluationReport(f"{output_file}.jsonl")
     
-    for scenario in scenarios:
-        logger.info(f"\nRunning scenario: {scenario.id}")
-        
-        # Get menu
-        menu = get_menu(scenario.menu)
-        
-        # Create normalizer
-        normalizer = CartNormalizer(menu)
-        
-        # Parse order
-        try:
-            actual_cart = normalizer.parse_order(scenario.input_text)
-        except Exception as e:
-            logger.error(f"Error parsing scenario {scenario.id}: {e}")
-            actual_cart = Cart()
-        
-        # Calculate metrics
-        exact_match = CartEvaluator.exact_match(actual_cart, scenario.expected_cart)
-        f1_score = CartEvaluator.calculate_f1(actual_cart, scenario.expected_cart)
-        item_accuracy = CartEvaluator.calculate_item_accuracy(actual_cart, scenario.expected_cart)
-        
-        metrics = {
-            "exact_match": exact_match,
-            "f1": f1_score,
-            "item_accuracy": item_accuracy
-        }
-        
-        report.add_result(scenario, actual_cart, metrics)
-        
-        if exact_match:
-            logger.info(f"✅ PASS: {scenario.id}")
-        else:
-            logger.warning(f"❌ FAIL: {scenario.id} (F1: {f1_score:.3f})")
+    # Build normalizers up front so forked workers inherit them
+    for name in {scenario.menu for scenario in scenarios}:
+        get_normalizer(name)
+    
+    try:
+        for scenario, (actual_cart, metrics) in zip(scenarios, iter_outcomes(scenarios, workers)):
+            report.add_result(scenario, actual_cart, metrics)
+            
+            if metrics["exact_match"]:
+                logger.info(f"✅ PASS: {scenario.id}")
+            else:
+                logger.warning(f"❌ FAIL: {scenario.id} (F1: {metrics['f1']:.3f})")
+    finally:
+        report.close()
     
     # Calculate summary
     report.calculate_summary()
@@ -192,12 +239,12 @@ def run_evaluation(menu_name: str = None, scenario_ids: List[str] = None, verbos
     report.print_summary()
     report.print_failures()
     
-    # Save to file
-    output_file = f"evaluation_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    with open(output_file, 'w') as f:
+    # Save summary to file
+    with open(f"{output_file}.json", 'w') as f:
         f.write(report.to_json())
     
-    print(f"\n📄 Full report saved to: {output_file}")
+    print(f"\n📄 Summary saved to: {output_file}.json")
+    print(f"📄 Per-scenario results saved to: {report.results_path}")
     
     return report
 
@@ -207,14 +254,16 @@ def main():
     parser.add_argument("--menu", choices=["small", "large"], help="Run scenarios for specific menu")
     parser.add_argument("--scenarios", nargs="+", help="Run specific scenario IDs")
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose logging")
-    parser.add_argument("--output", "-o", help="Output file for JSON report")
+    parser.add_argument("--output", "-o", help="Output file for JSON report summary")
+    parser.add_argument("--workers", "-j", type=int, help="Worker processes (default: all CPUs, 1 for in-process)")
     
     args = parser.parse_args()
     
     report = run_evaluation(
         menu_name=args.menu,
         scenario_ids=args.scenarios,
-        verbose=args.verbose
+        verbose=args.verbose,
+        workers=args.workers
     )
     
     if args.output:
@@ -4,11 +4,13 @@ Contains both small (baseline) and large (challenging) menus with aliases,
 size mappings, and modifiers.
 """
 
-from dataclasses import dataclass
-from typing import Dict, List, Optional
+import sys
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class MenuItem:
     """Represents a single menu item with its properties."""
     sku: str
@@ -16,34 +18,56 @@ class MenuItem:
     category: str
     price: float
     base_price: float  # For items with size variations
-    aliases: List[str]
-    size_variations: Dict[str, float]  # size_name -> price_delta
-    modifiers: List[str]
-    modifier_synonyms: Dict[str, str]  # synonym -> canonical name
+    aliases: Tuple[str, ...]
+    size_variations: Mapping[str, float] = field(hash=False)  # size_name -> price_delta
+    modifiers: Tuple[str, ...]
+    modifier_synonyms: Mapping[str, str] = field(hash=False)  # synonym -> canonical name
+    
+    def __post_init__(self):
+        """
+        Intern the canonical name so name comparisons hit the identity fast path,
+        and make the mapping fields read-only (they are left out of the hash).
+        """
+        object.__setattr__(self, 'name', sys.intern(self.name))
+        object.__setattr__(self, 'size_variations', MappingProxyType(dict(self.size_variations)))
+        object.__setattr__(self, 'modifier_synonyms', MappingProxyType(dict(self.modifier_synonyms)))
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Menu:
     """Complete menu with normalization data."""
     name: str
-    items: List[MenuItem]
-    size_synonyms: Dict[str, str]  # "large" -> "L"
-    default_sizes: Dict[str, str]  # category -> default size
+    items: Tuple[MenuItem, ...]
+    size_synonyms: Mapping[str, str] = field(hash=False)  # "large" -> "L"
+    default_sizes: Mapping[str, str] = field(hash=False)  # category -> default size
+    _sku_index: Mapping[str, MenuItem] = field(default_factory=dict, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        """
+        Index items by SKU (first item wins on duplicates) and make the mapping
+        fields read-only, so the menu hashes by name and items.
+        """
+        sku_index = {}
+        for item in self.items:
+            sku_index.setdefault(item.sku, item)
+        object.__setattr__(self, '_sku_index', MappingProxyType(sku_index))
+        object.__setattr__(self, 'size_synonyms', MappingProxyType(dict(self.size_synonyms)))
+        object.__setattr__(self, 'default_sizes', MappingProxyType(dict(self.default_sizes)))
 
 
 # Small Menu - Baseline (works well)
 SMALL_MENU = Menu(
     name="Small Menu",
-    items=[
+    items=(
         MenuItem(
             sku="DON001",
             name="Pumpkin Spice Iced Doughnut",
             category="donuts",
             price=1.29,
             base_price=1.29,
-            aliases=["pumpkin spice donut", "pumpkin donut", "ps donut", "pumpkin iced"],
+            aliases=("pumpkin spice donut", "pumpkin donut", "ps donut", "pumpkin iced"),
             size_variations={},
-            modifiers=[],
+            modifiers=(),
             modifier_synonyms={}
         ),
         MenuItem(
@@ -52,9 +76,9 @@ SMALL_MENU = Menu(
             category="donuts",
             price=1.09,
             base_price=1.09,
-            aliases=["chocolate donut", "choc donut", "chocolate glazed"],
+            aliases=("chocolate donut", "choc donut", "chocolate glazed"),
             size_variations={},
-            modifiers=["sprinkles"],
+            modifiers=("sprinkles",),
             modifier_synonyms={"with sprinkles": "sprinkles", "sprinkled": "sprinkles"}
         ),
         MenuItem(
@@ -63,9 +87,9 @@ SMALL_MENU = Menu(
             category="donuts",
             price=1.09,
             base_price=1.09,
-            aliases=["raspberry donut", "raspberry filled", "rasp filled"],
+            aliases=("raspberry donut", "raspberry filled", "rasp filled"),
             size_variations={},
-            modifiers=[],
+            modifiers=(),
             modifier_synonyms={}
         ),
         MenuItem(
@@ -74,9 +98,9 @@ SMALL_MENU = Menu(
             category="coffee",
             price=1.79,
             base_price=1.79,
-            aliases=["coffee", "regular coffee", "brewed coffee", "black coffee"],
+            aliases=("coffee", "regular coffee", "brewed coffee", "black coffee"),
             size_variations={"small": 0.0, "medium": 0.3, "large": 0.6},
-            modifiers=["cream", "sugar", "milk"],
+            modifiers=("cream", "sugar", "milk"),
             modifier_synonyms={"with cream": "cream", "creamer": "cream", "sweet": "sugar"}
         ),
         MenuItem(
@@ -85,12 +109,12 @@ SMALL_MENU = Menu(
             category="coffee",
             price=4.59,
             base_price=4.59,
-            aliases=["pumpkin spice latte", "psl", "pumpkin latte", "ps latte"],
+            aliases=("pumpkin spice latte", "psl", "pumpkin latte", "ps latte"),
             size_variations={"small": 0.0, "medium": 0.5, "large": 1.0},
-            modifiers=["extra shot", "whip", "no whip", "almond milk", "oat milk"],
+            modifiers=("extra shot", "whip", "no whip", "almond milk", "oat milk"),
             modifier_synonyms={"whipped cream": "whip", "no whipped cream": "no whip"}
         ),
-    ],
+    ),
     size_synonyms={
         "small": "small", "s": "small", "sm": "small", "regular": "small",
         "medium": "medium", "m": "medium", "med": "medium",
@@ -105,7 +129,7 @@ SMALL_MENU = Menu(
 # Large Menu - Challenging (causes failures)
 LARGE_MENU = Menu(
     name="Large Menu",
-    items=[
+    items=(
         # DONUTS
         MenuItem(
             sku="DON001",
@@ -113,10 +137,10 @@ LARGE_MENU = Menu(
             category="donuts",
             price=1.29,
             base_price=1.29,
-            aliases=["pumpkin spice donut", "pumpkin donut", "ps donut", "pumpkin iced", 
-                     "pumpkin spice", "pumpkin glazed", "ps iced"],
+            aliases=("pumpkin spice donut", "pumpkin donut", "ps donut", "pumpkin iced", 
+                     "pumpkin spice", "pumpkin glazed", "ps iced"),
             size_variations={},
-            modifiers=[],
+            modifiers=(),
             modifier_synonyms={}
         ),
         MenuItem(
@@ -125,10 +149,10 @@ LARGE_MENU = Menu(
             category="donuts",
             price=1.29,
             base_price=1.29,
-            aliases=["pumpkin cake donut", "pumpkin cake", "ps cake", "pumpkin spice cake",
-                     "cake donut pumpkin"],
+            aliases=("pumpkin cake donut", "pumpkin cake", "ps cake", "pumpkin spice cake",
+                     "cake donut pumpkin"),
             size_variations={},
-            modifiers=[],
+            modifiers=(),
             modifier_synonyms={}
         ),
         MenuItem(
@@ -137,10 +161,10 @@ LARGE_MENU = Menu(
             category="donuts",
             price=1.29,
             base_price=1.29,
-            aliases=["old fashioned", "old fashioned donut", "old fashioned doughnut",
-                     "old fashion", "plain cake donut"],
+            aliases=("old fashioned", "old fashioned donut", "old fashioned doughnut",
+                     "old fashion", "plain cake donut"),
             size_variations={},
-            modifiers=[],
+            modifiers=(),
             modifier_synonyms={}
         ),
         MenuItem(
@@ -149,10 +173,10 @@ LARGE_MENU = Menu(
             category="donuts",
             price=1.09,
             base_price=1.09,
-            aliases=["chocolate donut", "choc donut", "chocolate glazed", "chocolate iced",
-                     "choc iced", "chocolate", "choc"],
+            aliases=("chocolate donut", "choc donut", "chocolate glazed", "chocolate iced",
+                     "choc iced", "chocolate", "choc"),
             size_variations={},
-            modifiers=["sprinkles"],
+            modifiers=("sprinkles",),
             modifier_synonyms={"with sprinkles": "sprinkles", "sprinkled": "sprinkles",
                                "rainbow sprinkles": "sprinkles", "colored sprinkles": "sprinkles"}
         ),
@@ -162,10 +186,10 @@ LARGE_MENU = Menu(
             category="donuts",
             price=1.09,
             base_price=1.09,
-            aliases=["raspberry donut", "raspberry filled", "rasp filled", "raspberry jelly",
-                     "raspberry jam", "rasp", "raspberry"],
+            aliases=("raspberry donut", "raspberry filled", "rasp filled", "raspberry jelly",
+                     "raspberry jam", "rasp", "raspberry"),
             size_variations={},
-            modifiers=[],
+            modifiers=(),
             modifier_synonyms={}
         ),
         MenuItem(
@@ -174,9 +198,9 @@ LARGE_MENU = Menu(
             category="donuts",
             price=1.09,
             base_price=1.09,
-            aliases=["blueberry donut", "blueberry cake", "blueberry", "blueberry cake donut"],
+            aliases=("blueberry donut", "blueberry cake", "blueberry", "blueberry cake donut"),
             size_variations={},
-            modifiers=[],
+            modifiers=(),
             modifier_synonyms={}
         ),
         MenuItem(
@@ -185,10 +209,10 @@ LARGE_MENU = Menu(
             category="donuts",
             price=1.09,
             base_price=1.09,
-            aliases=["strawberry donut", "strawberry iced", "strawberry glazed", "strawberry",
-                     "strawberry with sprinkles", "strawberry sprinkled"],
+            aliases=("strawberry donut", "strawberry iced", "strawberry glazed", "strawberry",
+                     "strawberry with sprinkles", "strawberry sprinkled"),
             size_variations={},
-            modifiers=["sprinkles"],
+            modifiers=("sprinkles",),
             modifier_synonyms={"with sprinkles": "sprinkles", "sprinkled": "sprinkles"}
         ),
         MenuItem(
@@ -197,9 +221,9 @@ LARGE_MENU = Menu(
             category="donuts",
             price=1.09,
             base_price=1.09,
-            aliases=["lemon donut", "lemon filled", "lemon jelly", "lemon jam", "lemon"],
+            aliases=("lemon donut", "lemon filled", "lemon jelly", "lemon jam", "lemon"),
             size_variations={},
-            modifiers=[],
+            modifiers=(),
             modifier_synonyms={}
         ),
         MenuItem(
@@ -208,9 +232,9 @@ LARGE_MENU = Menu(
             category="donuts",
             price=3.99,
             base_price=3.99,
-            aliases=["donut holes", "donut holes dozen", "holes", "munchkins", "donut munchkins"],
+            aliases=("donut holes", "donut holes dozen", "holes", "munchkins", "donut munchkins"),
             size_variations={},
-            modifiers=[],
+            modifiers=(),
             modifier_synonyms={}
         ),
         
@@ -221,9 +245,9 @@ LARGE_MENU = Menu(
             category="coffee",
             price=2.59,
             base_price=2.59,
-            aliases=["pumpkin spice coffee", "ps coffee", "pumpkin coffee", "pumpkin brew"],
+            aliases=("pumpkin spice coffee", "ps coffee", "pumpkin coffee", "pumpkin brew"),
             size_variations={"small": 0.0, "medium": 0.3, "large": 0.6},
-            modifiers=["cream", "sugar", "milk", "extra shot"],
+            modifiers=("cream", "sugar", "milk", "extra shot"),
             modifier_synonyms={"with cream": "cream", "creamer": "cream", "sweet": "sugar"}
         ),
         MenuItem(
@@ -232,9 +256,9 @@ LARGE_MENU = Menu(
             category="coffee",
             price=4.59,
             base_price=4.59,
-            aliases=["pumpkin spice latte", "psl", "pumpkin latte", "ps latte", "pumpkin spice latte"],
+            aliases=("pumpkin spice latte", "psl", "pumpkin latte", "ps latte", "pumpkin spice latte"),
             size_variations={"small": 0.0, "medium": 0.5, "large": 1.0},
-            modifiers=["extra shot", "whip", "no whip", "almond milk", "oat milk"],
+            modifiers=("extra shot", "whip", "no whip", "almond milk", "oat milk"),
             modifier_synonyms={"whipped cream": "whip", "no whipped cream": "no whip"}
         ),
         MenuItem(
@@ -243,10 +267,10 @@ LARGE_MENU = Menu(
             category="coffee",
             price=1.79,
             base_price=1.79,
-            aliases=["coffee", "regular coffee", "brewed coffee", "black coffee", "regular",
-                     "house coffee", "drip coffee"],
+            aliases=("coffee", "regular coffee", "brewed coffee", "black coffee", "regular",
+                     "house coffee", "drip coffee"),
             size_variations={"small": 0.0, "medium": 0.3, "large": 0.6},
-            modifiers=["cream", "sugar", "milk"],
+            modifiers=("cream", "sugar", "milk"),
             modifier_synonyms={"with cream": "cream", "creamer": "cream", "sweet": "sugar"}
         ),
         MenuItem(
@@ -255,9 +279,9 @@ LARGE_MENU = Menu(
             category="coffee",
             price=1.79,
             base_price=1.79,
-            aliases=["decaf", "decaf coffee", "decaffeinated", "decaf brewed"],
+            aliases=("decaf", "decaf coffee", "decaffeinated", "decaf brewed"),
             size_variations={"small": 0.0, "medium": 0.3, "large": 0.6},
-            modifiers=["cream", "sugar", "milk"],
+            modifiers=("cream", "sugar", "milk"),
             modifier_synonyms={"with cream": "cream", "creamer": "cream", "sweet": "sugar"}
         ),
         MenuItem(
@@ -266,9 +290,9 @@ LARGE_MENU = Menu(
             category="coffee",
             price=3.49,
             base_price=3.49,
-            aliases=["latte", "cafe latte", "coffee latte"],
+            aliases=("latte", "cafe latte", "coffee latte"),
             size_variations={"small": 0.0, "medium": 0.4, "large": 0.8},
-            modifiers=["extra shot", "decaf", "almond milk", "oat milk", "skim milk", "whole milk"],
+            modifiers=("extra shot", "decaf", "almond milk", "oat milk", "skim milk", "whole milk"),
             modifier_synonyms={"almond": "almond milk", "oat": "oat milk", "skim": "skim milk"}
         ),
         MenuItem(
@@ -277,9 +301,9 @@ LARGE_MENU = Menu(
             category="coffee",
             price=3.49,
             base_price=3.49,
-            aliases=["cappuccino", "capp", "cappucino"],
+            aliases=("cappuccino", "capp", "cappucino"),
             size_variations={"small": 0.0, "medium": 0.4, "large": 0.8},
-            modifiers=["extra shot", "decaf", "almond milk", "oat milk", "skim milk"],
+            modifiers=("extra shot", "decaf", "almond milk", "oat milk", "skim milk"),
             modifier_synonyms={"almond": "almond milk", "oat": "oat milk", "skim": "skim milk"}
         ),
         MenuItem(
@@ -288,9 +312,9 @@ LARGE_MENU = Menu(
             category="coffee",
             price=3.49,
             base_price=3.49,
-            aliases=["caramel macchiato", "caramel mac", "caramel mach", "macchiato"],
+            aliases=("caramel macchiato", "caramel mac", "caramel mach", "macchiato"),
             size_variations={"small": 0.0, "medium": 0.4, "large": 0.8},
-            modifiers=["extra shot", "decaf", "almond milk", "oat milk", "extra caramel"],
+            modifiers=("extra shot", "decaf", "almond milk", "oat milk", "extra caramel"),
             modifier_synonyms={"almond": "almond milk", "oat": "oat milk"}
         ),
         MenuItem(
@@ -299,9 +323,9 @@ LARGE_MENU = Menu(
             category="coffee",
             price=3.49,
             base_price=3.49,
-            aliases=["mocha", "mocha latte", "chocolate latte", "choc latte"],
+            aliases=("mocha", "mocha latte", "chocolate latte", "choc latte"),
             size_variations={"small": 0.0, "medium": 0.4, "large": 0.8},
-            modifiers=["extra shot", "decaf", "almond milk", "oat milk", "whip", "no whip"],
+            modifiers=("extra shot", "decaf", "almond milk", "oat milk", "whip", "no whip"),
             modifier_synonyms={"almond": "almond milk", "oat": "oat milk", "whipped cream": "whip"}
         ),
         MenuItem(
@@ -310,12 +334,12 @@ LARGE_MENU = Menu(
             category="coffee",
             price=3.49,
             base_price=3.49,
-            aliases=["caramel mocha", "caramel mocha latte", "caramel choc latte"],
+            aliases=("caramel mocha", "caramel mocha latte", "caramel choc latte"),
             size_variations={"small": 0.0, "medium": 0.4, "large": 0.8},
-            modifiers=["extra shot", "decaf", "almond milk", "oat milk", "whip", "no whip"],
+            modifiers=("extra shot", "decaf", "almond milk", "oat milk", "whip", "no whip"),
             modifier_synonyms={"almond": "almond milk", "oat": "oat milk", "whipped cream": "whip"}
         ),
-    ],
+    ),
     size_synonyms={
         "small": "small", "s": "small", "sm": "small", "regular": "small", "short": "small",
         "medium": "medium", "m": "medium", "med": "medium", "grande": "medium",
@@ -329,26 +353,25 @@ LARGE_MENU = Menu(
 )
 
 
+MENUS = {
+    "small": SMALL_MENU,
+    "large": LARGE_MENU,
+}
+
+
 def get_menu(menu_name: str = "small") -> Menu:
     """Get a menu by name."""
-    menus = {
-        "small": SMALL_MENU,
-        "large": LARGE_MENU,
-    }
-    return menus.get(menu_name.lower(), SMALL_MENU)
+    return MENUS.get(menu_name.casefold(), SMALL_MENU)
 
 
-def get_all_items(menu: Menu) -> List[MenuItem]:
+def get_all_items(menu: Menu) -> Tuple[MenuItem, ...]:
     """Get all items from a menu."""
     return menu.items
 
 
 def find_item_by_sku(menu: Menu, sku: str) -> Optional[MenuItem]:
     """Find a menu item by SKU."""
-    for item in menu.items:
-        if item.sku == sku:
-            return item
-    return None
+    return menu._sku_index.get(sku)
 
 
 
@@ -6,9 +6,16 @@ Handles intent detection, entity extraction, and cart operations
 
 import re
 import logging
+from functools import lru_cache
 from typing import Dict, List, Tuple, Optional
-from cart_engine import Cart, CartItem
-from menu_data import Menu
+from cart_engine import AliasAutomaton, Cart, CartItem
+from menu_data import Menu, MenuItem
+
+try:
+    # Optional RE2 engine (google-re2): linear-time DFA matching for intent scoring
+    import re2 as _intent_regex
+except ImportError:
+    _intent_regex = re
 
 logger = logging.getLogger(__name__)
 
@@ -22,12 +29,61 @@ class IntentType:
     CANCEL = "cancel"
     UNKNOWN = "unknown"
 
+# Whole-utterance confirmations and cancellations answered without any matching
+_TRIVIAL_UTTERANCES: Dict[str, Tuple[str, float]] = {
+    **dict.fromkeys(
+        ["yes", "yeah", "yep", "correct", "right", "that's right", "sounds good",
+         "perfect", "confirm", "proceed", "go ahead"],
+        (IntentType.CONFIRM, 0.99)
+    ),
+    **dict.fromkeys(
+        ["cancel", "stop", "abort", "never mind", "forget it"],
+        (IntentType.CANCEL, 0.99)
+    ),
+}
+
+# Priority keywords for detect_intent: single words and two-word phrases,
+# matched against the utterance's tokens and adjacent token pairs
+_TOKEN_RE = re.compile(r"[\w']+")
+_WORD_RE = re.compile(r'\w+')
+_REMOVE_KEYWORDS = frozenset(["remove", "delete", "take out"])
+_ADD_KEYWORDS = frozenset(["add", "get", "want", "need", "order", "have", "take"])
+# Negated add verbs ("don't want", "do not need", ...) as token bigrams
+_ADD_NEGATIONS = frozenset(
+    f"{negation} {verb}" for negation in ("don't", "not") for verb in ("want", "need", "have")
+)
+_CONFIRM_KEYWORDS = frozenset(["confirm", "yes", "yeah", "correct", "right", "that's right"])
+
+# Quantity vocabulary for the entity extractors
+_NUMBER_MAP = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10
+}
+_NUMBER_RE = re.compile(r'\b(' + '|'.join(_NUMBER_MAP) + r'|\d+)\b')
+
+def _keyword_terms(text_lower: str) -> set:
+    """Tokens of the text plus each pair of adjacent tokens, for keyword lookups"""
+    tokens = _TOKEN_RE.findall(text_lower)
+    terms = set(tokens)
+    terms.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    return terms
+
+def _on_word_boundary(text: str, start: int, end: int) -> bool:
+    """Check that text[start:end] is not embedded in a longer word"""
+    before = text[start - 1] if start > 0 else ' '
+    after = text[end] if end < len(text) else ' '
+    return not (before.isalnum() or before == '_' or after.isalnum() or after == '_')
+
 class NLPProcessor:
     """Advanced NLP processor for understanding user intent and extracting cart operations"""
     
     def __init__(self, menu: Menu):
         self.menu = menu
         self._setup_patterns()
+        # Intent and menu item lookups are deterministic per utterance, so
+        # memoize them on the lowercased text
+        self._detect_intent_cached = lru_cache(maxsize=512)(self._detect_intent)
+        self._match_menu_item_cached = lru_cache(maxsize=512)(self._match_menu_item)
     
     def _setup_patterns(self):
         """Setup regex patterns for intent detection"""
@@ -80,6 +136,53 @@ class NLPProcessor:
         self.size_patterns = [
             r'\b(small|medium|large|regular|venti|grande)\b',
         ]
+        
+        # Intent patterns in scoring order, compiled once
+        intent_sources = {
+            IntentType.ADD: self.add_patterns,
+            IntentType.REMOVE: self.remove_patterns,
+            IntentType.MODIFY: self.modify_patterns,
+            IntentType.QUERY: self.query_patterns,
+            IntentType.CONFIRM: self.confirm_patterns,
+            IntentType.CANCEL: self.cancel_patterns,
+        }
+        self._intent_patterns: Dict[str, List[re.Pattern]] = {
+            intent: [_intent_regex.compile(pattern) for pattern in patterns]
+            for intent, patterns in intent_sources.items()
+        }
+        
+        # Longest word of every alternative in each intent's \b(a|b|...)\b
+        # patterns. An alternative only matches where all its words occur as
+        # whole words, so intents sharing no vocabulary word with the utterance
+        # score zero without running their regexes
+        self._intent_vocab: Dict[str, frozenset] = {
+            intent: frozenset(
+                max(_WORD_RE.findall(alternative), key=len)
+                for pattern in patterns
+                for alternative in pattern[len(r'\b('):-len(r')\b')].split('|')
+            )
+            for intent, patterns in intent_sources.items()
+        }
+        
+        # Size synonyms from the menu, longest first so "extra large" beats
+        # "large"; apostrophes count as word characters so "i'm" is not "m"
+        self._size_re = re.compile(
+            r"(?<![\w'])(" + '|'.join(map(re.escape, sorted(self.menu.size_synonyms, key=len, reverse=True))) + r")(?![\w'])"
+        )
+        
+        # Menu item phrases (lowercased names and aliases) -> menu positions of
+        # every item listing the phrase, in menu order; matched in one pass
+        alias_index: Dict[str, List[int]] = {}
+        for index, item in enumerate(self.menu.items):
+            for phrase in dict.fromkeys(phrase.lower() for phrase in [item.name, *item.aliases]):
+                alias_index.setdefault(phrase, []).append(index)
+        self._item_automaton = AliasAutomaton(list(alias_index), word_bounded=False)
+        # Static part of each phrase's rank: (owner count, -length, first owner's
+        # position), so matching touches only this table and resolves the item once
+        self._phrase_rank: Dict[str, Tuple[int, int, int]] = {
+            phrase: (len(owners), -len(phrase), owners[0])
+            for phrase, owners in alias_index.items()
+        }
     
     def detect_intent(self, text: str) -> Tuple[str, float]:
         """
@@ -87,35 +190,40 @@ class NLPProcessor:
         Returns: (intent_type, confidence)
         """
         text_lower = text.lower()
+        trivial = _TRIVIAL_UTTERANCES.get(text_lower.strip(" .,!?"))
+        if trivial:
+            return trivial
+        return self._detect_intent_cached(text_lower)
+    
+    def _detect_intent(self, text_lower: str) -> Tuple[str, float]:
+        """Detect the intent of a lowercased utterance (uncached)"""
+        terms = _keyword_terms(text_lower)
         
         # PRIORITY CHECK: Look for explicit remove keywords first
         # This prevents "I would like to remove" from being detected as "add"
-        if any(keyword in text_lower for keyword in ["remove", "delete", "take out", "take off", "don't want", "don't need", "cancel", "scratch"]):
-            # Double-check it's not a false positive
-            if "remove" in text_lower or "delete" in text_lower or "take out" in text_lower:
-                logger.info(f"🎯 Priority match: REMOVE detected (keyword found)")
-                return IntentType.REMOVE, 0.95
+        if not terms.isdisjoint(_REMOVE_KEYWORDS):
+            logger.info(f"🎯 Priority match: REMOVE detected (keyword found)")
+            return IntentType.REMOVE, 0.95
         
         # PRIORITY CHECK: Look for explicit add keywords
-        if any(keyword in text_lower for keyword in ["add", "get", "want", "need", "order", "have", "take"]):
-            # Make sure it's not "don't want" or "don't need"
-            if not any(phrase in text_lower for phrase in ["don't want", "don't need", "don't have"]):
+        if not terms.isdisjoint(_ADD_KEYWORDS):
+            # Make sure it's not "don't want", "do not need", ...
+            if terms.isdisjoint(_ADD_NEGATIONS):
                 logger.info(f"🎯 Priority match: ADD detected (keyword found)")
                 return IntentType.ADD, 0.90
         
         # PRIORITY CHECK: Look for explicit confirm keywords
-        if any(keyword in text_lower for keyword in ["confirm", "yes", "yeah", "correct", "right", "that's right"]):
+        if not terms.isdisjoint(_CONFIRM_KEYWORDS):
             logger.info(f"🎯 Priority match: CONFIRM detected (keyword found)")
             return IntentType.CONFIRM, 0.85
         
-        # Check each intent type and calculate confidence
+        # Check each intent type and calculate confidence, scoring only
+        # intents whose vocabulary appears in the utterance
+        words = set(_WORD_RE.findall(text_lower))
         intent_scores = {
-            IntentType.ADD: self._calculate_intent_score(text_lower, self.add_patterns),
-            IntentType.REMOVE: self._calculate_intent_score(text_lower, self.remove_patterns),
-            IntentType.MODIFY: self._calculate_intent_score(text_lower, self.modify_patterns),
-            IntentType.QUERY: self._calculate_intent_score(text_lower, self.query_patterns),
-            IntentType.CONFIRM: self._calculate_intent_score(text_lower, self.confirm_patterns),
-            IntentType.CANCEL: self._calculate_intent_score(text_lower, self.cancel_patterns),
+            intent: self._calculate_intent_score(text_lower, patterns)
+            if not words.isdisjoint(self._intent_vocab[intent]) else 0.0
+            for intent, patterns in self._intent_patterns.items()
         }
         
         # Get the highest scoring intent
@@ -131,82 +239,61 @@ class NLPProcessor:
         
         return best_intent
     
-    def _calculate_intent_score(self, text: str, patterns: List[str]) -> float:
+    def _calculate_intent_score(self, text: str, patterns: List[re.Pattern]) -> float:
         """Calculate confidence score for an intent based on pattern matches"""
         matches = 0
         for pattern in patterns:
-            if re.search(pattern, text):
+            if pattern.search(text):
                 matches += 1
         return matches / len(patterns) if patterns else 0.0
     
     def extract_quantity(self, text: str) -> int:
-        """Extract quantity from text"""
-        text_lower = text.lower()
-        
-        # Number words to digits
-        number_map = {
-            'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
-            'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10
-        }
-        
-        # Check for number words
-        for word, num in number_map.items():
-            if word in text_lower:
-                return num
-        
-        # Check for digits
-        digit_match = re.search(r'\b(\d+)\b', text)
-        if digit_match:
-            return int(digit_match.group(1))
+        """Extract quantity from text (the first number word or digits mentioned)"""
+        match = _NUMBER_RE.search(text.lower())
+        if match:
+            quantity = match.group(1)
+            return _NUMBER_MAP.get(quantity) or int(quantity)
         
         # Default to 1 if no quantity mentioned
         return 1
     
     def extract_size(self, text: str) -> Optional[str]:
-        """Extract size from text"""
-        text_lower = text.lower()
-        
-        size_map = {
-            'small': 'small',
-            'medium': 'medium',
-            'large': 'large',
-            'regular': 'medium',
-            'venti': 'large',
-            'grande': 'large'
-        }
-        
-        for keyword, size in size_map.items():
-            if keyword in text_lower:
-                return size
+        """Extract size from text (the first of the menu's size synonyms mentioned)"""
+        match = self._size_re.search(text.lower())
+        if match:
+            return self.menu.size_synonyms[match.group(1)]
         
         return None
     
     def extract_menu_item(self, text: str) -> Optional[Dict]:
-        """Extract menu item from text"""
-        text_lower = text.lower()
+        """
+        Extract menu item from text.
+        Whole-word matches beat matches inside a longer word, then phrases
+        shared by fewer items beat ambiguous ones, then the longest name or
+        alias wins (so "pumpkin coffee" beats "coffee"); ties go to the item
+        listed first on the menu.
+        """
+        item = self._match_menu_item_cached(text.lower())
+        if item is None:
+            return None
         
-        # Try to match against menu items
-        for item in self.menu.items:
-            # Check exact name match
-            if item.name.lower() in text_lower:
-                return {
-                    'sku': item.sku,
-                    'name': item.name,
-                    'price': item.price,
-                    'aliases': item.aliases
-                }
-            
-            # Check aliases
-            for alias in item.aliases:
-                if alias.lower() in text_lower:
-                    return {
-                        'sku': item.sku,
-                        'name': item.name,
-                        'price': item.price,
-                        'aliases': item.aliases
-                    }
+        return {
+            'sku': item.sku,
+            'name': item.name,
+            'price': item.price,
+            'aliases': item.aliases
+        }
+    
+    def _match_menu_item(self, text_lower: str) -> Optional[MenuItem]:
+        """Find the best matching menu item in a lowercased utterance (uncached)"""
+        phrase_rank = self._phrase_rank
+        best = None
+        for start, end, phrase in self._item_automaton.iter(text_lower):
+            rank = (not _on_word_boundary(text_lower, start, end), phrase_rank[phrase])
+            if best is None or rank < best:
+                best = rank
         
-        return None
+        return self.menu.items[best[1][2]] if best else None
     
     def process_cart_operation(self, text: str, current_cart: Cart) -> Dict:
         """
@@ -285,15 +372,17 @@ class NLPProcessor:
         """Process remove operation with enhanced logic"""
         try:
             text_lower = text.lower()
+            menu_item = self.extract_menu_item(text)
+            
+            # Cart lines for the mentioned item, shared by every branch below
+            matches = [item for item in current_cart.items if item.name == menu_item['name']] if menu_item else []
             
             # Check for "remove all" or "remove all X"
             if "remove all" in text_lower or "take out all" in text_lower or "delete all" in text_lower:
-                menu_item = self.extract_menu_item(text)
                 if menu_item:
-                    # Remove all instances of this item
-                    items_to_remove = [item for item in current_cart.items if item.name == menu_item['name']]
-                    for item in items_to_remove:
-                        current_cart.items.remove(item)
+                    # Remove all instances of this item in one pass
+                    items_to_remove = matches
+                    current_cart.items[:] = [item for item in current_cart.items if item.name != menu_item['name']]
                     
                     if items_to_remove:
                         logger.info(f"➖ Removed all {menu_item['name']} from cart")
@@ -306,24 +395,16 @@ class NLPProcessor:
             
             # Check for "just keep one" or "keep only one"
             if "just keep" in text_lower or "keep only" in text_lower or "only keep" in text_lower:
-                menu_item = self.extract_menu_item(text)
                 if menu_item:
-                    # Find all instances of this item
-                    items_to_adjust = [item for item in current_cart.items if item.name == menu_item['name']]
-                    
-                    if items_to_adjust:
-                        # Keep only the first one, remove the rest
-                        total_quantity = sum(item.quantity for item in items_to_adjust)
-                        
-                        # Remove all instances
-                        for item in items_to_adjust:
-                            current_cart.items.remove(item)
-                        
-                        # Add back just one
-                        if items_to_adjust:
-                            first_item = items_to_adjust[0]
-                            first_item.quantity = 1
-                            current_cart.items.append(first_item)
+                    if matches:
+                        # Keep only the first one, in place, and drop the rest in one pass
+                        first_item = matches[0]
+                        total_quantity = sum(item.quantity for item in matches)
+                        first_item.quantity = 1
+                        current_cart.items[:] = [
+                            item for item in current_cart.items
+                            if item is first_item or item.name != menu_item['name']
+                        ]
                         
                         logger.info(f"➖ Reduced {menu_item['name']} from {total_quantity} to 1")
                         return {
@@ -334,7 +415,6 @@ class NLPProcessor:
                         }
             
             # Regular remove operation
-            menu_item = self.extract_menu_item(text)
             if not menu_item:
                 return {
                     'operation': 'remove',
@@ -348,9 +428,8 @@ class NLPProcessor:
             
             # Find matching items in cart
             items_to_remove = []
-            for item in current_cart.items:
-                if (item.name == menu_item['name'] and 
-                    (size is None or item.size == size)):
+            for item in matches:
+                if size is None or item.size == size:
                     
                     if item.quantity > quantity:
                         # Reduce quantity
@@ -367,9 +446,10 @@ class NLPProcessor:
                         logger.info(f"➖ Removed all {item.quantity}x {menu_item['name']}")
                         items_to_remove.append(item)
             
-            # Remove items that have zero quantity
-            for item in items_to_remove:
-                current_cart.items.remove(item)
+            # Remove items that have zero quantity in one pass
+            if items_to_remove:
+                removed = {id(item) for item in items_to_remove}
+                current_cart.items[:] = [item for item in current_cart.items if id(item) not in removed]
             
             if items_to_remove:
                 return {
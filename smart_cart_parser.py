@@ -6,102 +6,203 @@ Handles complex order parsing and cart management
 
 import re
 import logging
-from typing import List, Dict, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from cart_engine import AliasAutomaton
+from menu_data import Menu, MenuItem
+
+try:
+    # Optional RE2 engine (google-re2): linear-time DFA matching for the
+    # parser's quantity/size prefix and follower patterns
+    import re2 as _parse_regex
+except ImportError:
+    _parse_regex = re
 
 logger = logging.getLogger(__name__)
 
+# Quantity words -> quantities
+QUANTITY_MAP = {
+    'zero': 0, 'no': 0, 'none': 0,
+    'one': 1, 'a': 1, 'an': 1, 'single': 1,
+    'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
+    'eleven': 11, 'twelve': 12, 'dozen': 12
+}
+
+# Optional quantity word/number and size that may precede an item phrase
+QUANTITY_PATTERN = r'(?P<qty>zero|no|none|one|a|an|single|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|\d+)?'
+SIZE_PATTERN = r'(?P<size>large|medium|small)?'
+# Sizes kept as parsed; anything else is 'regular'
+VALID_SIZES = frozenset(('small', 'medium', 'large'))
+
+# Item phrases with more flexible matching: (phrase, canonical item name,
+# whether a quantity/size prefix is read, pattern that must not follow)
+ITEM_PHRASES = [
+    # Coffee phrases
+    ('regular brewed coffee', 'Regular Brewed Coffee', True, None),
+    ('pumpkin spice latte', 'Pumpkin Spice Latte', True, None),
+    ('latte', 'Latte', True, r' ?(?:pumpkin|spice)'),
+    # Donut phrases
+    ('pumpkin spice iced doughnut', 'Pumpkin Spice Iced Doughnut', False, None),
+    ('chocolate iced doughnut', 'Chocolate Iced Doughnut', False, None),
+    ('raspberry filled doughnut', 'Raspberry Filled Doughnut', False, None),
+]
+
+# All item phrases are found in one automaton pass over whitespace-collapsed,
+# lowercased text; each hit then reads its prefix and checks its suffix
+_ITEM_AUTOMATON = AliasAutomaton([phrase for phrase, _, _, _ in ITEM_PHRASES], word_bounded=False)
+_ITEM_SPECS = {
+    phrase: (index, item_name, reads_prefix, _parse_regex.compile(excluded) if excluded else None)
+    for index, (phrase, item_name, reads_prefix, excluded) in enumerate(ITEM_PHRASES)
+}
+# Shared quantity/size prefix, anchored to the end of the searched span; the
+# text has no newlines once whitespace is collapsed, so $ is the span end.
+# Collapsed text has at most one space between words, so ' ?' stands in for
+# '\s*' and leaves each attempt a single way to match (no backtracking)
+_PREFIX_RE = _parse_regex.compile(QUANTITY_PATTERN + ' ?' + SIZE_PATTERN + ' ?$')
+# Agent phrasing that signals a removal, or restates the whole order; both
+# sets are found together in one automaton pass
+_REMOVAL_PHRASES = frozenset([
+    "removed", "removing", "taking out", "now you just have",
+    "only have", "took off", "deleted"
+])
+_FINAL_STATE_PHRASES = frozenset([
+    "now you just have", "now you have", "your order is now",
+    "you only have", "that leaves you with"
+])
+_SIGNAL_AUTOMATON = AliasAutomaton(sorted(_REMOVAL_PHRASES | _FINAL_STATE_PHRASES), word_bounded=False)
+
+# How far back from an item phrase its quantity/size prefix is looked for
+PREFIX_WINDOW = 32
+
+
+@dataclass(slots=True, frozen=True)
+class ParsedItem:
+    """An item the agent mentioned, with its quantity and size"""
+    name: str
+    quantity: int
+    price: float
+    size: str
+    modifiers: Tuple[str, ...] = ()
+
+
 class SmartCartParser:
     """Advanced cart parser using NLP techniques"""
     
-    def __init__(self, menu):
+    def __init__(self, menu: Menu):
         self.menu = menu
-        self.quantity_map = {
-            'zero': 0, 'no': 0, 'none': 0,
-            'one': 1, 'a': 1, 'an': 1, 'single': 1,
-            'two': 2, 'three': 3, 'four': 4, 'five': 5,
-            'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
-            'eleven': 11, 'twelve': 12, 'dozen': 12
-        }
+        self.quantity_map = QUANTITY_MAP
         
-        # Item patterns with more flexible matching
-        self.item_patterns = [
-            # Coffee patterns
-            (r'(zero|no|none|one|a|an|single|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|\d+)?\s*(large|medium|small)?\s*regular\s+brewed\s+coffee[s]?', 'Regular Brewed Coffee'),
-            (r'(zero|no|none|one|a|an|single|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|\d+)?\s*(large|medium|small)?\s*pumpkin\s+spice\s+latte[s]?', 'Pumpkin Spice Latte'),
-            (r'(zero|no|none|one|a|an|single|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|\d+)?\s*(large|medium|small)?\s*latte[s]?(?!\s*(?:pumpkin|spice))', 'Latte'),
-            # Donut patterns  
-            (r'(zero|no|none|one|a|an|single|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|\d+)?\s*pumpkin\s+spice\s+iced\s+doughnut[s]?', 'Pumpkin Spice Iced Doughnut'),
-            (r'(zero|no|none|one|a|an|single|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|\d+)?\s*chocolate\s+iced\s+doughnut[s]?', 'Chocolate Iced Doughnut'),
-            (r'(zero|no|none|one|a|an|single|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|\d+)?\s*raspberry\s+filled\s+doughnut[s]?', 'Raspberry Filled Doughnut'),
-        ]
+        # Menu items by lowercased name
+        self._menu_by_lower = {menu_item.name.lower(): menu_item for menu_item in self.menu.items}
+        
+        # Menu item for each item phrase: the item with exactly the canonical
+        # name, else the first whose name contains it (None if neither exists)
+        self._phrase_menu_items: List[Optional[MenuItem]] = []
+        for _, item_name, _, _ in ITEM_PHRASES:
+            item_name_lower = item_name.lower()
+            menu_item = self._menu_by_lower.get(item_name_lower)
+            if menu_item is None:
+                menu_item = next((candidate for name_lower, candidate in self._menu_by_lower.items()
+                                  if item_name_lower in name_lower), None)
+            self._phrase_menu_items.append(menu_item)
+        
+        # Agent phrasing repeats verbatim across turns, so memoize on the raw text
+        self._parse_cached = lru_cache(maxsize=1024)(self._parse_agent_text)
     
-    def parse_agent_text(self, text: str) -> Tuple[List[Dict], bool]:
+    def parse_agent_text(self, text: str) -> Tuple[List[ParsedItem], bool]:
         """Parse agent text and return items and whether it's a removal"""
+        items, is_removal = self._parse_cached(text)
+        # Parsed items are immutable, so cached ones can be shared
+        return list(items), is_removal
+    
+    def _parse_agent_text(self, text: str) -> Tuple[Tuple[ParsedItem, ...], bool]:
+        """Parse agent text (uncached)"""
         text_lower = text.lower()
-        is_removal = any(phrase in text_lower for phrase in [
-            "removed", "removing", "taking out", "now you just have", 
-            "only have", "took off", "deleted"
-        ])
         
-        # Check for final state indicators
-        is_final_state = any(phrase in text_lower for phrase in [
-            "now you just have", "now you have", "your order is now",
-            "you only have", "that leaves you with"
-        ])
+        # Check for removal phrasing and the leftmost final state indicator
+        is_removal = False
+        final_state = None
+        for start, end, phrase in _SIGNAL_AUTOMATON.iter(text_lower):
+            if phrase in _REMOVAL_PHRASES:
+                is_removal = True
+            if phrase in _FINAL_STATE_PHRASES and (final_state is None or start < final_state[0]):
+                final_state = (start, end, phrase)
         
-        items = []
-        
-        if is_final_state:
-            # Extract text after the final state phrase
-            for phrase in ["now you just have", "now you have", "your order is now", "you only have", "that leaves you with"]:
-                if phrase in text_lower:
-                    remaining_text = text_lower.split(phrase)[1]
-                    items = self._extract_items_from_text(remaining_text)
-                    break
+        if final_state:
+            # Extract text after the final state phrase (up to any repeat of it)
+            _, end, phrase = final_state
+            remaining_text = text_lower[end:].partition(phrase)[0]
+            items = self._iter_items_from_text(remaining_text)
         else:
             # Parse all items mentioned
-            items = self._extract_items_from_text(text_lower)
+            items = self._iter_items_from_text(text_lower)
         
-        return items, is_removal
+        return tuple(items), is_removal
     
-    def _extract_items_from_text(self, text: str) -> List[Dict]:
-        """Extract items from text using patterns"""
-        items = []
+    def _iter_items_from_text(self, text: str) -> Iterator[ParsedItem]:
+        """Yield items from text using a single pass over all item phrases"""
+        text = ' '.join(text.split())
         
-        for pattern, item_name in self.item_patterns:
-            matches = re.findall(pattern, text)
-            for match in matches:
-                if isinstance(match, tuple):
-                    quantity_str = match[0] if match[0] else 'one'
-                    size = match[1] if len(match) > 1 and match[1] else 'regular'
-                else:
-                    quantity_str = 'one'
-                    size = 'regular'
-                
-                # Convert quantity
-                if quantity_str.isdigit():
+        # Where phrases end together ("latte" in "pumpkin spice latte"), only the longest counts
+        longest: Dict[int, Tuple[int, str]] = {}
+        for start, end, phrase in _ITEM_AUTOMATON.iter(text):
+            if end not in longest or start < longest[end][0]:
+                longest[end] = (start, phrase)
+        
+        # (quantity, size) per item phrase, in text order; a phrase's matches never overlap
+        found: List[List[Tuple[str, str]]] = [[] for _ in ITEM_PHRASES]
+        match_ends = [0] * len(ITEM_PHRASES)
+        # Bind hot-loop lookups locally (LOAD_FAST instead of global/attribute lookups)
+        item_specs = _ITEM_SPECS
+        phrase_menu_items = self._phrase_menu_items
+        prefix_search = _PREFIX_RE.search
+        text_startswith = text.startswith
+        for end, (start, phrase) in sorted(longest.items(), key=lambda hit: hit[1][0]):
+            index, _, reads_prefix, excluded_re = item_specs[phrase]
+            match_start = match_ends[index]
+            if start < match_start:
+                continue
+            # Optional plural s, giving it back if that lets the excluded follower check pass
+            match_end = end + 1 if text_startswith('s', end) else end
+            if excluded_re and excluded_re.match(text, match_end):
+                if match_end == end or excluded_re.match(text, end):
+                    continue
+                match_end = end
+            match_ends[index] = match_end
+            
+            # Phrases this menu doesn't carry only shadow shorter phrases
+            if phrase_menu_items[index] is None:
+                continue
+            if not reads_prefix:
+                found[index].append(('one', 'regular'))
+                continue
+            # Leftmost prefix ending right at the phrase (it may be empty)
+            prefix = prefix_search(text, max(match_start, start - PREFIX_WINDOW), start)
+            found[index].append((prefix.group('qty') or 'one', prefix.group('size') or 'regular'))
+        
+        for menu_item, matches in zip(phrase_menu_items, found):
+            for quantity_str, size in matches:
+                # Convert quantity (the prefix only captures quantity words or digits)
+                try:
+                    quantity = QUANTITY_MAP[quantity_str]
+                except KeyError:
                     quantity = int(quantity_str)
-                else:
-                    quantity = self.quantity_map.get(quantity_str, 1)
                 
                 # Skip zero quantities
                 if quantity <= 0:
                     continue
                 
-                # Find matching menu item
-                for menu_item in self.menu.items:
-                    if item_name.lower() in menu_item.name.lower():
-                        items.append({
-                            'name': menu_item.name,
-                            'quantity': quantity,
-                            'price': menu_item.price,
-                            'size': size if size in ['small', 'medium', 'large'] else 'regular',
-                            'modifiers': []
-                        })
-                        logger.info(f"🔍 Parsed: {quantity}x {size} {menu_item.name}")
-                        break
-        
-        return items
+                # Lazy %-formatting: nothing is formatted unless INFO is enabled
+                logger.info("🔍 Parsed: %sx %s %s", quantity, size, menu_item.name)
+                yield ParsedItem(
+                    name=menu_item.name,
+                    quantity=quantity,
+                    price=menu_item.price,
+                    size=size if size in VALID_SIZES else 'regular'
+                )
 
 if __name__ == "__main__":
     # Test the parser
@@ -1,4 +1,5 @@
 import asyncio
+import atexit
 import json
 import logging
 import os
@@ -7,20 +8,76 @@ import datetime
 import urllib.parse
 from datetime import datetime
 from flask import Flask, render_template, request, jsonify, session
-from flask_socketio import SocketIO, emit
+from flask.json.provider import JSONProvider
+from flask_socketio import SocketIO, emit, join_room
 import uuid
 import base64
 import threading
+import time
 from websockets.asyncio import client as ws_client
 import websockets
 import concurrent.futures
-import queue
+import itertools
+from collections import deque
 
 # Import cart engine
-from cart_engine import Cart, CartNormalizer, CartItem
+from cart_engine import AliasAutomaton, Cart, CartNormalizer, CartItem
 from menu_data import get_menu
+from nlp_processor import NLPProcessor
 from smart_cart_parser import SmartCartParser
 
+try:
+    # Optional uvloop (libuv-based) event loop for the shared session loop
+    import uvloop as _event_loops
+except ImportError:
+    _event_loops = asyncio
+
+try:
+    # Optional orjson for Ultravox data messages, API responses and Socket.IO
+    # packets (decoded back to str, since all of them go out as text)
+    import orjson
+    _json_loads = orjson.loads
+    _json_fragment = getattr(orjson, 'Fragment', None)  # orjson >= 3.9
+    
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+    _json_fragment = None
+
+
+def json_fragment(obj):
+    """Serialize a value that is reused across responses once, as an orjson Fragment
+    embedded verbatim by later dumps (the value itself where Fragment isn't available)"""
+    if _json_fragment is None:
+        return obj
+    return _json_fragment(orjson.dumps(obj))
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider that serializes jsonify() responses with orjson"""
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return _json_dumps(obj)
+    
+    def loads(self, s, **kwargs):
+        return _json_loads(s)
+
+
+class OrjsonPacketCodec:
+    """json-module stand-in so python-socketio encodes emitted packets with orjson"""
+    
+    @staticmethod
+    def dumps(obj, *args, **kwargs) -> str:
+        return _json_dumps(obj)
+    
+    @staticmethod
+    def loads(s, *args, **kwargs):
+        return _json_loads(s)
+
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -28,74 +85,155 @@ logger = logging.getLogger(__name__)
 # Initialize Flask app
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'dr-donut-secret-key-' + str(uuid.uuid4())
-socketio = SocketIO(app, cors_allowed_origins="*")
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+socketio = SocketIO(app, cors_allowed_origins="*", json=OrjsonPacketCodec if orjson is not None else None)
+
+SESSION_SHARDS = 16  # Lock shards in the session store (power of two)
+
+
+class SessionStore:
+    """Thread-safe session map, split into shards that each have their own lock"""
+    
+    def __init__(self, shards: int = SESSION_SHARDS):
+        self._mask = shards - 1
+        self._shards = [{} for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+    
+    def _shard(self, session_id):
+        index = hash(session_id) & self._mask
+        return self._shards[index], self._locks[index]
+    
+    def __contains__(self, session_id):
+        shard, lock = self._shard(session_id)
+        with lock:
+            return session_id in shard
+    
+    def __getitem__(self, session_id):
+        shard, lock = self._shard(session_id)
+        with lock:
+            return shard[session_id]
+    
+    def __setitem__(self, session_id, ultravox_session):
+        shard, lock = self._shard(session_id)
+        with lock:
+            shard[session_id] = ultravox_session
+    
+    def __delitem__(self, session_id):
+        shard, lock = self._shard(session_id)
+        with lock:
+            del shard[session_id]
+    
+    def get(self, session_id, default=None):
+        shard, lock = self._shard(session_id)
+        with lock:
+            return shard.get(session_id, default)
+    
+    def pop(self, session_id, default=None):
+        shard, lock = self._shard(session_id)
+        with lock:
+            return shard.pop(session_id, default)
+    
+    def items(self):
+        """Snapshot of (session_id, session) pairs, taken shard by shard"""
+        snapshot = []
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                snapshot.extend(shard.items())
+        return snapshot
+    
+    def keys(self):
+        return [session_id for session_id, _ in self.items()]
+    
+    def values(self):
+        return [ultravox_session for _, ultravox_session in self.items()]
+    
+    def __len__(self):
+        return sum(len(shard) for shard in self._shards)
+    
+    def clear(self):
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                shard.clear()
+
 
 # Global state
-user_sessions = {}
+user_sessions = SessionStore()
+
+# Seconds a new session gets to create its Ultravox call before cleanup may remove it
+SESSION_CONNECT_GRACE = 60.0
+
+# (created_at, session_id) of new sessions in creation order, for cleanup_old_sessions
+_unconnected_sessions = deque()
+_unconnected_sessions_lock = threading.Lock()
 
 # Ultravox API configuration
 ULTRAVOX_API_KEY = os.getenv("ULTRAVOX_API_KEY", "dNCvf2hQ.X47W2tIr1iTWP1ehuLDkPUFik0M7KXkT")
 
-class UltravoxVoiceSession:
-    """Manages a voice session with Ultravox WebSocket"""
-    
-    def __init__(self, session_id: str, menu_name: str = "small"):
-        self.session_id = session_id
-        self.menu = get_menu(menu_name)
-        self.cart_normalizer = CartNormalizer(self.menu)
-        self.smart_parser = SmartCartParser(self.menu)  # Add smart parser
-        self.cart = Cart()
-        self.order_history = []
-        self.websocket = None
-        self.join_url = None
-        self.is_connected = False
-        self.user_transcripts = []
-        self.room_id = None  # Store the room ID for socket emissions
-        self._loop = None
-        self._loop_thread = None
-        self._audio_queue = queue.Queue()
-        self._running = False
-        self._pending_user_input = ""  # Initialize pending user input
-        self._pending_agent_output = ""  # Initialize pending agent output
-        
-    def _start_event_loop(self):
-        """Start a dedicated event loop in a separate thread"""
-        def run_loop():
-            self._loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(self._loop)
-            try:
-                self._loop.run_forever()
-            finally:
-                self._loop.close()
-        
-        self._loop_thread = threading.Thread(target=run_loop, daemon=True)
-        self._loop_thread.start()
-        
-        # Wait for loop to be ready
-        while self._loop is None:
-            threading.Event().wait(0.01)
-    
-    def _stop_event_loop(self):
-        """Stop the event loop"""
-        if self._loop and self._loop.is_running():
-            self._loop.call_soon_threadsafe(self._loop.stop)
-        if self._loop_thread:
-            self._loop_thread.join(timeout=1.0)
-        
-    async def create_ultravox_call(self):
-        """Create a new Ultravox call and get join URL"""
-        try:
-            target = "https://api.ultravox.ai/api/calls"
+# Max audio chunks buffered per session; when full, the oldest half is dropped
+AUDIO_QUEUE_MAXSIZE = 512
+# Queued audio chunks are coalesced into frames of up to ~20 ms (48 kHz s16),
+# with ~10 ms frames for the first few sends to keep time-to-first-audio low
+AUDIO_FRAME_BYTES = 3840
+AUDIO_RAMP_FRAME_BYTES = 1920
+AUDIO_RAMP_FRAMES = 3
+# Audio that has waited longer than this (seconds) is dropped rather than sent late
+AUDIO_MAX_AGE = 0.2
+
+# How often (seconds) per-session audio and message counters are logged
+STREAM_STATS_INTERVAL = 5.0
+
+# Interim (delta) transcripts are coalesced and emitted at most this often, in seconds
+INTERIM_EMIT_INTERVAL = 0.05
+
+# Agent phrasing that marks a final response as an order recap worth syncing
+# from, and the wider set that counts as a full recap once synced
+_RECAP_TRIGGERS = AliasAutomaton([
+    "to recap", "your order", "so now you've got", "total comes out"
+], word_bounded=False)
+_RECAP_INDICATORS = AliasAutomaton([
+    "so to recap", "to recap", "let me recap", "your order",
+    "you've got", "so now you've got", "that's", "your total"
+], word_bounded=False)
+
+# Worker threads for transcript parsing, so intent detection and order parsing
+# don't stall audio and websocket traffic on the shared session loop
+_nlp_executor = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="nlp")
+
+# Background event loop shared by all voice sessions (one thread, not one per session)
+_session_loop = None
+_session_loop_lock = threading.Lock()
+
+
+def get_session_loop():
+    """Get the shared session event loop, starting it in a background thread on first use"""
+    global _session_loop
+    with _session_loop_lock:
+        if _session_loop is None:
+            loop_ready = threading.Event()
             
-            # Get current cart state for the system prompt
-            cart_summary = self._get_cart_summary()
+            def run_loop():
+                global _session_loop
+                loop = _event_loops.new_event_loop()
+                asyncio.set_event_loop(loop)
+                _session_loop = loop
+                # Signal readiness from inside the loop once it is running
+                loop.call_soon(loop_ready.set)
+                loop.run_forever()
+            
+            threading.Thread(target=run_loop, daemon=True).start()
             
-            system_prompt = f"""
-You are a drive-thru order taker for a donut shop called "Dr. Donut". Local time is currently: {datetime.now().isoformat()}
+            # Wait for loop to be ready
+            loop_ready.wait(timeout=2.0)
+    return _session_loop
+
+# Ultravox system prompt; only the local time and the cart change per call
+SYSTEM_PROMPT_TEMPLATE = """
+You are a drive-thru order taker for a donut shop called "Dr. Donut". Local time is currently: {timestamp}
 The user is talking to you over voice on their phone, and your response will be read out loud with realistic text-to-speech (TTS) technology.
 
 IMPORTANT: The current order in the cart is:
-{cart_summary}
+{cart}
 
 You MUST reference this cart when responding. If the user asks to remove something, check if it's actually in the cart above before saying it's not there.
 
@@ -136,34 +274,127 @@ REGULAR BREWED COFFEE $1.79
 LATTE $3.49
 """
 
-            timeout = aiohttp.ClientTimeout(total=30)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                headers = {"X-API-Key": ULTRAVOX_API_KEY}
-                body = {
-                    "systemPrompt": system_prompt,
-                    "temperature": 0.8,
-                    "medium": {
-                        "serverWebSocket": {
-                            "inputSampleRate": 48000,
-                            "outputSampleRate": 48000,
-                            "clientBufferSizeMs": 30000,
-                        }
-                    },
-                }
+# Static part of the Ultravox call request body
+ULTRAVOX_CALL_MEDIUM = {
+    "serverWebSocket": {
+        "inputSampleRate": 48000,
+        "outputSampleRate": 48000,
+        "clientBufferSizeMs": 30000,
+    }
+}
+
+# HTTP session shared by all Ultravox API calls (keeps the HTTPS connection alive);
+# it belongs to the shared session loop, so only use it from coroutines running there
+_http_session = None
+
+
+async def get_http_session():
+    """Get the shared Ultravox HTTP session, creating it on first use"""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=30),
+            json_serialize=_json_dumps
+        )
+    return _http_session
+
+
+@atexit.register
+def _close_http_session():
+    """Close the shared HTTP session on its loop at shutdown"""
+    if _http_session is not None and not _http_session.closed and _session_loop is not None:
+        asyncio.run_coroutine_threadsafe(_http_session.close(), _session_loop).result(timeout=5.0)
+
+# One NLP processor per menu name, shared by every session on that menu (it only
+# holds per-menu indexes and parse caches, no conversation state)
+_nlp_processors = {}
+
+
+def get_nlp_processor(menu) -> NLPProcessor:
+    """Get the shared NLP processor for a menu, building it on first use"""
+    processor = _nlp_processors.get(menu.name)
+    if processor is None:
+        processor = _nlp_processors.setdefault(menu.name, NLPProcessor(menu))
+    return processor
+
+
+class UltravoxVoiceSession:
+    """Manages a voice session with Ultravox WebSocket"""
+    
+    def __init__(self, session_id: str, menu_name: str = "small"):
+        self.session_id = session_id
+        self.menu = get_menu(menu_name)
+        self.cart_normalizer = CartNormalizer(self.menu)
+        self.smart_parser = SmartCartParser(self.menu)  # Add smart parser
+        self.nlp = get_nlp_processor(self.menu)  # Intent detection for user transcripts
+        self.cart = Cart()
+        self._cart_summary_cache = None  # Agent-facing cart summary, cleared by cart_changed()
+        self._cart_dict_cache = None  # cart.to_dict() for emits and responses, cleared by cart_changed()
+        self.order_history = []
+        self.order_history_payload = []  # order_history entries as json_fragment()s, built at confirmation
+        self.websocket = None
+        self.join_url = None
+        self.is_connected = False
+        self.user_transcripts = []
+        self.room_id = None  # Socket.IO room of the session's browser (None broadcasts)
+        self._loop = get_session_loop()  # All of the session's async work runs on the shared loop
+        self._audio_queue = asyncio.Queue(maxsize=AUDIO_QUEUE_MAXSIZE)
+        self._audio_processor = None  # Future for the running _process_audio_queue
+        self._audio_drops = 0  # Audio chunks dropped because they went stale
+        self._last_drop_log = 0.0
+        self._audio_chunks_queued = 0  # Stream counters, logged by _log_stream_stats
+        self._audio_frames_sent = 0
+        self._messages_received = 0
+        self._stats_logger = None  # Future for the running _log_stream_stats
+        self._agent_update_pending = False  # An agent cart update is being sent
+        self._agent_update_dirty = False  # The cart changed again while it was sent
+        self._running = False
+        self._pending_user_input = ""  # Initialize pending user input
+        self._pending_agent_output = ""  # Initialize pending agent output
+        self._user_emit_handle = None  # TimerHandle of the pending interim user transcript flush
+        self._agent_emit_handle = None  # TimerHandle of the pending interim agent response flush
+        
+    def _stop_event_loop(self):
+        """Stop the session's work on the shared event loop (the loop keeps running)"""
+        if self._audio_processor:
+            self._audio_processor.cancel()
+            self._audio_processor = None
+        if self._stats_logger:
+            self._stats_logger.cancel()
+            self._stats_logger = None
+        
+    async def create_ultravox_call(self):
+        """Create a new Ultravox call and get join URL"""
+        try:
+            target = "https://api.ultravox.ai/api/calls"
+            
+            # Get current cart state for the system prompt
+            cart_summary = self._get_cart_summary()
+            
+            system_prompt = SYSTEM_PROMPT_TEMPLATE.format(timestamp=datetime.now().isoformat(), cart=cart_summary)
+
+            session = await get_http_session()
+            headers = {"X-API-Key": ULTRAVOX_API_KEY}
+            body = {
+                "systemPrompt": system_prompt,
+                "temperature": 0.8,
+                "medium": ULTRAVOX_CALL_MEDIUM,
+            }
+            
+            async with session.post(target, headers=headers, json=body) as response:
+                response.raise_for_status()
+                response_json = await response.json()
+                self.join_url = response_json["joinUrl"]
+                logger.info(f"Created Ultravox call: {self.join_url}")
+                return True
                 
-                async with session.post(target, headers=headers, json=body) as response:
-                    response.raise_for_status()
-                    response_json = await response.json()
-                    self.join_url = response_json["joinUrl"]
-                    logger.info(f"Created Ultravox call: {self.join_url}")
-                    return True
-                    
         except Exception as e:
             logger.error(f"Failed to create Ultravox call: {e}")
             return False
     
     async def connect_websocket(self):
-        """Connect to Ultravox WebSocket"""
+        """Connect to Ultravox WebSocket (runs on the shared session loop)"""
         if not self.join_url:
             logger.info("🔗 Creating Ultravox call...")
             if not await self.create_ultravox_call():
@@ -171,29 +402,25 @@ LATTE $3.49
                 return False
         
         try:
-            # Start dedicated event loop if not already running
-            if not self._loop:
-                logger.info("🔄 Starting dedicated event loop...")
-                self._start_event_loop()
-            
-            # Schedule the connection in the dedicated loop with timeout
-            logger.info("⏱️ Scheduling WebSocket connection...")
-            future = asyncio.run_coroutine_threadsafe(
-                self._connect_websocket_async(), 
-                self._loop
-            )
+            # Cancel the audio processor and stats logger of any earlier connection,
+            # so a reconnect never leaves two consumers on the audio queue
+            self._stop_event_loop()
             
             # Wait for connection with timeout
-            result = future.result(timeout=20.0)  # 20 second total timeout
+            result = await asyncio.wait_for(self._connect_websocket_async(), timeout=20.0)  # 20 second total timeout
             
             if result:
                 # Start the audio processor AFTER successful connection
                 logger.info("🎵 Starting audio processor...")
-                asyncio.run_coroutine_threadsafe(
+                self._audio_processor = asyncio.run_coroutine_threadsafe(
                     self._process_audio_queue(), 
                     self._loop
                 )
                 logger.info("✅ Audio processor started successfully")
+                self._stats_logger = asyncio.run_coroutine_threadsafe(
+                    self._log_stream_stats(),
+                    self._loop
+                )
             else:
                 logger.error("❌ WebSocket connection failed")
             
@@ -240,25 +467,30 @@ LATTE $3.49
         
         while self._running:
             try:
-                # Check for audio data (non-blocking)
-                try:
-                    audio_data = self._audio_queue.get_nowait()
-                    audio_chunk_count += 1
-                    
-                    if audio_chunk_count <= 10 or audio_chunk_count % 50 == 0:
-                        logger.info(f"⚡ Processing audio chunk #{audio_chunk_count}, size: {len(audio_data)} bytes, queue remaining: {self._audio_queue.qsize()}")
-                    
-                    if self.websocket and self.is_connected:
-                        await self.websocket.send(audio_data)
-                        if audio_chunk_count <= 5 or audio_chunk_count % 50 == 0:
-                            logger.info(f"✅ Successfully sent audio chunk #{audio_chunk_count} to Ultravox")
-                    else:
-                        logger.warning(f"❌ Cannot send audio chunk #{audio_chunk_count}: websocket={bool(self.websocket)}, connected={self.is_connected}")
-                        
-                except queue.Empty:
-                    # No audio data, wait a bit
-                    await asyncio.sleep(0.01)
+                # Wait for audio data without polling
+                queued_at, audio_data = await self._audio_queue.get()
+                
+                # Drop audio that sat in the queue too long, to keep the stream current
+                if time.monotonic() - queued_at > AUDIO_MAX_AGE:
+                    self._record_audio_drops(1)
                     continue
+                audio_chunk_count += 1
+                
+                # Coalesce chunks that are already waiting into one send
+                frame_bytes = AUDIO_RAMP_FRAME_BYTES if audio_chunk_count <= AUDIO_RAMP_FRAMES else AUDIO_FRAME_BYTES
+                if len(audio_data) < frame_bytes and not self._audio_queue.empty():
+                    frame = bytearray(audio_data)
+                    while len(frame) < frame_bytes and not self._audio_queue.empty():
+                        frame += self._audio_queue.get_nowait()[1]
+                    audio_data = bytes(frame)
+                
+                if self.websocket and self.is_connected:
+                    await self.websocket.send(audio_data)
+                    self._audio_frames_sent += 1
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(f"✅ Sent audio frame #{audio_chunk_count} ({len(audio_data)} bytes) to Ultravox")
+                else:
+                    logger.warning(f"❌ Cannot send audio chunk #{audio_chunk_count}: websocket={bool(self.websocket)}, connected={self.is_connected}")
                     
             except Exception as e:
                 logger.error(f"💥 Error processing audio chunk #{audio_chunk_count}: {e}")
@@ -268,31 +500,33 @@ LATTE $3.49
     
     async def _listen_websocket(self):
         """Listen for messages from Ultravox WebSocket"""
+        websocket = self.websocket
         try:
             logger.info(f"🔊 Starting WebSocket message listener for session {self.session_id}")
-            message_count = 0
-            
-            async for message in self.websocket:
-                message_count += 1
-                if message_count <= 10 or message_count % 50 == 0:
-                    logger.info(f"📨 Received WebSocket message #{message_count}")
-                    
-                await self._handle_websocket_message(message)
+            async for message in websocket:
+                self._messages_received += 1
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"📨 Received WebSocket message #{self._messages_received}")
+                
+                # Text frames are data messages; binary frames (agent audio) aren't used here
+                if type(message) is not str:
+                    continue
+                try:
+                    await self._handle_data_message(_json_loads(message))
+                except Exception as e:
+                    logger.error(f"Error handling WebSocket message: {e}")
                 
         except Exception as e:
             logger.error(f"💥 WebSocket listening error: {e}")
             self.is_connected = False
             self._running = False
-    
-    async def _handle_websocket_message(self, message):
-        """Handle incoming WebSocket messages"""
-        try:
-            if isinstance(message, str):
-                data = json.loads(message)
-                await self._handle_data_message(data)
-            # Audio data is handled separately if needed
-        except Exception as e:
-            logger.error(f"Error handling WebSocket message: {e}")
+        finally:
+            # The audio processor waits on the queue rather than polling _running,
+            # so stop it here unless a reconnect has already replaced this websocket
+            if self.websocket is websocket:
+                self.is_connected = False
+                self._running = False
+                self._stop_event_loop()
     
     async def _handle_data_message(self, msg: dict):
         """Handle data messages from Ultravox"""
@@ -320,12 +554,15 @@ LATTE $3.49
                     # Final transcript with text
                     self.user_transcripts.append(text)
                     
+                    # Drop any coalesced interim so it can't land after the final
+                    self._cancel_user_interim()
+                    
                     # Emit user transcript to web client
                     socketio.emit('user_transcript', {
                         'text': text,
                         'final': True,
                         'session_id': self.session_id
-                    })
+                    }, to=self.room_id)
                     
                     # Process the order when transcript is final
                     await self._update_cart_from_transcript(text)
@@ -336,40 +573,38 @@ LATTE $3.49
                         self._pending_user_input = ""
                     self._pending_user_input += delta
                     
-                    # Emit interim transcript without logging
-                    socketio.emit('user_transcript', {
-                        'text': self._pending_user_input,
-                        'final': False,
-                        'session_id': self.session_id
-                    })
-                    
                     if final:
-                        # Reset pending input when final
-                        self._pending_user_input = ""
+                        # Emit straight away and reset pending input when final
+                        self._cancel_user_interim(flush=True)
+                    elif self._user_emit_handle is None:
+                        # Coalesce deltas into one interim emit per interval
+                        self._user_emit_handle = self._loop.call_later(INTERIM_EMIT_INTERVAL, self._flush_user_interim)
                         
             elif role == "agent":
                 # Handle agent transcripts - REDUCE CONSOLE SPAM
                 if text:
+                    # Drop any coalesced interim so it can't land after the final
+                    self._cancel_agent_interim()
+                    
                     # Process final agent responses
                     socketio.emit('agent_response', {
                         'text': text,
                         'final': True,
                         'session_id': self.session_id
-                    })
+                    }, to=self.room_id)
                     
                 # Process agent confirmations for cart updates - only on complete recaps
-                if any(phrase in text.lower() for phrase in [
-                    "to recap", "your order", "so now you've got", "total comes out"
-                ]) and len(text.split()) > 10:  # Only process substantial responses
+                if (next(_RECAP_TRIGGERS.iter(text.lower()), None) is not None
+                        and len(text.split()) > 10):  # Only process substantial responses
                     await self._sync_cart_from_agent_response(text)
                 else:
                     # For short responses, don't modify cart - just preserve state
                     logger.info(f"🔒 Preserving cart during short agent response: '{text[:50]}...'")
                     # Emit current cart to keep UI in sync
                     socketio.emit('cart_update', {
-                        'cart': self.cart.to_dict(),
+                        'cart': self.cart_dict(),
                         'session_id': self.session_id
-                    })
+                    }, to=self.room_id)
                 
             elif delta:
                     # Handle deltas silently - only emit to client, don't log
@@ -377,15 +612,11 @@ LATTE $3.49
                         self._pending_agent_output = ""
                     self._pending_agent_output += delta
                     
-                    # Emit to client without logging spam
-                    socketio.emit('agent_response', {
-                        'text': self._pending_agent_output,
-                        'final': False,
-                        'session_id': self.session_id
-                    })
-                    
                     if final:
-                        self._pending_agent_output = ""
+                        self._cancel_agent_interim(flush=True)
+                    elif self._agent_emit_handle is None:
+                        # Coalesce deltas into one interim emit per interval
+                        self._agent_emit_handle = self._loop.call_later(INTERIM_EMIT_INTERVAL, self._flush_agent_interim)
                 
         elif msg_type == "state":
             state = msg.get("state")
@@ -393,29 +624,66 @@ LATTE $3.49
             socketio.emit('voice_state', {
                 'state': state,
                 'session_id': self.session_id
-            })
+            }, to=self.room_id)
             
         else:
             logger.info(f"❓ Unhandled message type: {msg_type}")
     
+    def _flush_user_interim(self):
+        """Emit the coalesced interim user transcript to the web client"""
+        self._user_emit_handle = None
+        if self._pending_user_input:
+            socketio.emit('user_transcript', {
+                'text': self._pending_user_input,
+                'final': False,
+                'session_id': self.session_id
+            }, to=self.room_id)
+    
+    def _flush_agent_interim(self):
+        """Emit the coalesced interim agent response to the web client"""
+        self._agent_emit_handle = None
+        if self._pending_agent_output:
+            socketio.emit('agent_response', {
+                'text': self._pending_agent_output,
+                'final': False,
+                'session_id': self.session_id
+            }, to=self.room_id)
+    
+    def _cancel_user_interim(self, flush: bool = False):
+        """Cancel any pending interim user transcript flush, optionally emit it now, and clear the buffer"""
+        if self._user_emit_handle is not None:
+            self._user_emit_handle.cancel()
+        if flush:
+            self._flush_user_interim()
+        self._user_emit_handle = None
+        self._pending_user_input = ""
+    
+    def _cancel_agent_interim(self, flush: bool = False):
+        """Cancel any pending interim agent response flush, optionally emit it now, and clear the buffer"""
+        if self._agent_emit_handle is not None:
+            self._agent_emit_handle.cancel()
+        if flush:
+            self._flush_agent_interim()
+        self._agent_emit_handle = None
+        self._pending_agent_output = ""
+    
     async def _update_cart_from_transcript(self, text: str):
         """Update cart from user transcript with NLP intent detection"""
         try:
-            # Import NLP processor
-            from nlp_processor import NLPProcessor
-            
-            # Create NLP processor for this session
-            nlp = NLPProcessor(self.menu)
+            loop = asyncio.get_running_loop()
             
-            # Detect intent
-            intent, confidence = nlp.detect_intent(text)
+            # Detect intent (parsing runs on the NLP worker threads)
+            intent, confidence = await loop.run_in_executor(_nlp_executor, self.nlp.detect_intent, text)
             
-            logger.info(f"🔍 Detected intent: {intent} (confidence: {confidence:.2f})")
+            logger.info("🔍 Detected intent: %s (confidence: %.2f)", intent, confidence)
             
             if intent == "remove":
                 # Handle remove operation
-                logger.info(f"➖ Processing remove operation...")
-                result = nlp.process_cart_operation(text, self.cart)
+                logger.debug("➖ Processing remove operation...")
+                result = self.nlp.process_cart_operation(text, self.cart)
+                # NLP removals drop cart lines without tracking the total
+                self.cart.total = sum(item.price * item.quantity for item in self.cart.items)
+                self.cart_changed()
                 
                 if result['success']:
                     logger.info(f"✅ {result['message']}")
@@ -424,34 +692,17 @@ LATTE $3.49
                     
             elif intent == "add":
                 # Handle add operation using existing cart normalizer
-                logger.info(f"➕ Processing add operation...")
+                logger.debug("➕ Processing add operation...")
                 
                 # Only clear cart if we successfully parse new items
                 try:
-                    new_items_cart = self.cart_normalizer.parse_order(text)
+                    new_items_cart = await loop.run_in_executor(_nlp_executor, self.cart_normalizer.parse_order, text)
                     
                     # Only process if we actually found items
                     if new_items_cart.items:
                         # Merge new items with existing cart instead of replacing
-                        for new_item in new_items_cart.items:
-                            # Check if item already exists in cart
-                            existing_item = None
-                            for existing in self.cart.items:
-                                if (existing.name == new_item.name and 
-                                    existing.size == new_item.size and 
-                                    set(existing.modifiers) == set(new_item.modifiers)):
-                                    existing_item = existing
-                                    break
-                            
-                            if existing_item:
-                                # Increase quantity of existing item
-                                existing_item.quantity += new_item.quantity
-                                logger.info(f"🔄 Updated existing item: {existing_item.name} (quantity: {existing_item.quantity})")
-                            else:
-                                # Add new item to cart
-                                self.cart.items.append(new_item)
-                                logger.info(f"➕ Added new item: {new_item.name} (quantity: {new_item.quantity})")
-                                
+                        self.merge_items(new_items_cart.items)
+                        
                         # Mark the time when we added items to prevent rapid duplicates
                         import time
                         self._last_addition_time = time.time()
@@ -463,13 +714,13 @@ LATTE $3.49
                         
             elif intent == "query":
                 # Handle query operation
-                logger.info(f"❓ Processing query operation...")
-                result = nlp.process_cart_operation(text, self.cart)
+                logger.debug("❓ Processing query operation...")
+                result = self.nlp.process_cart_operation(text, self.cart)
                 logger.info(f"📋 Query result: {result['message']}")
                 
             elif intent == "confirm":
                 # Handle confirm operation - automatically trigger order confirmation
-                logger.info(f"✅ Processing confirm operation - triggering order confirmation...")
+                logger.debug("✅ Processing confirm operation - triggering order confirmation...")
                 result = self.confirm_order()
                 
                 if result["success"]:
@@ -480,13 +731,13 @@ LATTE $3.49
                         'order': result["order"],
                         'session_id': self.session_id,
                         'auto_confirmed': True  # Flag to indicate this was automatic
-                    })
+                    }, to=self.room_id)
                     
                     # Also trigger the confirm button click in the UI
                     socketio.emit('auto_confirm_order', {
                         'session_id': self.session_id,
                         'message': 'Order confirmed automatically via voice command!'
-                    })
+                    }, to=self.room_id)
                     
                     logger.info(f"🎉 Order auto-confirmed via voice: {result['message']}")
                 else:
@@ -494,54 +745,37 @@ LATTE $3.49
                 
             elif intent == "cancel":
                 # Handle cancel operation
-                logger.info(f"❌ Processing cancel operation...")
+                logger.debug("❌ Processing cancel operation...")
                 self.clear_cart()
                 
             else:
                 # Unknown intent - try to parse as add but be defensive
-                logger.info(f"❓ Unknown intent, attempting to parse as add...")
+                logger.debug("❓ Unknown intent, attempting to parse as add...")
                 try:
-                    new_items_cart = self.cart_normalizer.parse_order(text)
+                    new_items_cart = await loop.run_in_executor(_nlp_executor, self.cart_normalizer.parse_order, text)
                     
                     if new_items_cart.items:
-                        for new_item in new_items_cart.items:
-                            existing_item = None
-                            for existing in self.cart.items:
-                                if (existing.name == new_item.name and 
-                                    existing.size == new_item.size and 
-                                    set(existing.modifiers) == set(new_item.modifiers)):
-                                    existing_item = existing
-                                    break
-                            
-                            if existing_item:
-                                existing_item.quantity += new_item.quantity
-                                logger.info(f"🔄 Updated existing item: {existing_item.name} (quantity: {existing_item.quantity})")
-                            else:
-                                self.cart.items.append(new_item)
-                                logger.info(f"➕ Added new item: {new_item.name} (quantity: {new_item.quantity})")
+                        self.merge_items(new_items_cart.items)
                     else:
                         logger.info(f"❓ No valid items parsed from unknown intent '{text}' - keeping existing cart")
                 except Exception as e:
                     logger.error(f"❌ Error parsing unknown intent: {e}")
                     logger.info("🔄 Keeping existing cart due to parse error")
             
-            # Recalculate total
-            self.cart.total = sum(item.price * item.quantity for item in self.cart.items)
-            
             # Emit cart update to web client
             socketio.emit('cart_update', {
-                'cart': self.cart.to_dict(),
+                'cart': self.cart_dict(),
                 'session_id': self.session_id
-            })
+            }, to=self.room_id)
             
             # Send cart update to agent to keep it in sync
-            if self._loop and self.is_connected:
+            if self.is_connected:
                 asyncio.run_coroutine_threadsafe(
                     self.update_agent_cart(),
                     self._loop
                 )
             
-            logger.info(f"📊 Updated cart for session {self.session_id}: {len(self.cart.items)} items, total: ${self.cart.total:.2f}")
+            logger.info("📊 Updated cart for session %s: %d items, total: $%.2f", self.session_id, len(self.cart.items), self.cart.total)
             
         except Exception as e:
             logger.error(f"Error updating cart: {e}")
@@ -559,26 +793,61 @@ LATTE $3.49
             
             # Just emit the current cart state to keep UI in sync
             socketio.emit('cart_update', {
-                'cart': self.cart.to_dict(),
+                'cart': self.cart_dict(),
                 'session_id': self.session_id
-            })
+            }, to=self.room_id)
             
         except Exception as e:
             logger.error(f"❌ Error processing agent confirmation: {e}")
     
+    def merge_items(self, new_items):
+        """Merge items into the cart, adding to the quantity of matching lines"""
+        # Index cart lines by (name, size, modifiers); the first matching line wins
+        lines = {}
+        for item in self.cart.items:
+            lines.setdefault((item.name, item.size, frozenset(item.modifiers)), item)
+        
+        for new_item in new_items:
+            key = (new_item.name, new_item.size, frozenset(new_item.modifiers))
+            existing_item = lines.get(key)
+            if existing_item:
+                # Increase quantity of existing item
+                existing_item.quantity += new_item.quantity
+                logger.debug("🔄 Updated existing item: %s (quantity: %d)", existing_item.name, existing_item.quantity)
+            else:
+                # Add new item to cart
+                self.cart.items.append(new_item)
+                lines[key] = new_item
+                logger.debug("➕ Added new item: %s (quantity: %d)", new_item.name, new_item.quantity)
+            # Keep the running total in step with the added units
+            self.cart.total += new_item.price * new_item.quantity
+        self.cart_changed()
+    
+    def cart_changed(self):
+        """Note that the cart was mutated, so cached views of it are rebuilt"""
+        self._cart_summary_cache = None
+        self._cart_dict_cache = None
+    
+    def cart_dict(self):
+        """Get the cart as a JSON-ready dict (cached until the cart changes)"""
+        if self._cart_dict_cache is None:
+            self._cart_dict_cache = self.cart.to_dict()
+        return self._cart_dict_cache
+    
     def clear_cart(self):
         """Clear the current cart for a new order"""
         self.cart = Cart()
+        self.cart_changed()
         logger.info(f"🗑️ Cleared cart for session {self.session_id}")
         
         # Emit cart update to web client
         socketio.emit('cart_update', {
-            'cart': self.cart.to_dict(),
+            'cart': self.cart_dict(),
             'session_id': self.session_id
-        })
+        }, to=self.room_id)
         
         # Send cart update to agent to keep it in sync
-        if self._loop and self.is_connected:
+        if self.is_connected:
             asyncio.run_coroutine_threadsafe(
                 self.update_agent_cart(),
                 self._loop
@@ -608,6 +877,7 @@ LATTE $3.49
             "order_id": str(uuid.uuid4())[:8]
         }
         self.order_history.append(order_summary)
+        self.order_history_payload.append(json_fragment(order_summary))
         
         # Store confirmed total before clearing
         confirmed_total = self.cart.total
@@ -628,20 +898,12 @@ LATTE $3.49
     def send_audio(self, audio_data: bytes):
         """Send audio data to Ultravox WebSocket (thread-safe)"""
         if self.is_connected and self._running:
-            try:
-                # Put audio data in queue for async processing
-                self._audio_queue.put_nowait(audio_data)
-                
-                # Debug: Log audio stats occasionally
-                if not hasattr(self, '_audio_send_count'):
-                    self._audio_send_count = 0
-                self._audio_send_count += 1
-                
-                if self._audio_send_count <= 10 or self._audio_send_count % 100 == 0:
-                    logger.info(f"Queued audio chunk #{self._audio_send_count}, size: {len(audio_data)} bytes, queue size: {self._audio_queue.qsize()}")
-                    
-            except queue.Full:
-                logger.warning("Audio queue is full, dropping audio data")
+            # Hand the audio to the session's event loop for async processing
+            self._loop.call_soon_threadsafe(self._enqueue_audio, audio_data)
+            
+            self._audio_chunks_queued += 1
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Queued audio chunk #{self._audio_chunks_queued}, size: {len(audio_data)} bytes")
         else:
             logger.warning(f"Cannot send audio: connected={self.is_connected}, running={self._running}")
             if not hasattr(self, '_audio_reject_count'):
@@ -650,10 +912,38 @@ LATTE $3.49
             if self._audio_reject_count <= 5:
                 logger.warning(f"Audio rejected #{self._audio_reject_count} times")
     
+    def _enqueue_audio(self, audio_data: bytes):
+        """Queue audio data for sending (runs on the session's event loop)"""
+        if self._audio_queue.full():
+            # Backed up: drop the oldest half so new audio isn't delayed behind it
+            dropped = 0
+            while self._audio_queue.qsize() > AUDIO_QUEUE_MAXSIZE // 2:
+                self._audio_queue.get_nowait()
+                dropped += 1
+            self._record_audio_drops(dropped)
+        self._audio_queue.put_nowait((time.monotonic(), audio_data))
+    
+    async def _log_stream_stats(self):
+        """Log the session's audio and message counters every few seconds while connected"""
+        while self._running:
+            await asyncio.sleep(STREAM_STATS_INTERVAL)
+            logger.info(f"📈 Session {self.session_id}: {self._audio_chunks_queued} audio chunks queued, "
+                        f"{self._audio_frames_sent} frames sent, {self._audio_drops} dropped, "
+                        f"{self._messages_received} messages received")
+    
+    def _record_audio_drops(self, count: int):
+        """Count dropped audio chunks, logging at most once per second"""
+        self._audio_drops += count
+        now = time.monotonic()
+        if now - self._last_drop_log >= 1.0:
+            self._last_drop_log = now
+            logger.warning(f"🗑️ Dropping stale audio for session {self.session_id} ({self._audio_drops} chunks so far)")
+    
     async def disconnect(self):
         """Disconnect from Ultravox WebSocket"""
         self._running = False
         if self.websocket:
+            # Runs on the session loop, where the websocket lives
             await self.websocket.close()
             self.is_connected = False
         self._stop_event_loop()
@@ -673,9 +963,12 @@ LATTE $3.49
         print("="*50 + "\n")
     
     def _get_cart_summary(self):
-        """Get cart summary as a string for the agent"""
+        """Get cart summary as a string for the agent (cached until the cart changes)"""
+        if self._cart_summary_cache is not None:
+            return self._cart_summary_cache
         if not self.cart.items:
-            return "The cart is currently empty."
+            self._cart_summary_cache = "The cart is currently empty."
+            return self._cart_summary_cache
         
         summary = "Current order:\n"
         for i, item in enumerate(self.cart.items, 1):
@@ -683,10 +976,28 @@ LATTE $3.49
             modifiers_str = f" with {', '.join(item.modifiers)}" if item.modifiers else ""
             summary += f"- {item.quantity}x {item.name}{size_str}{modifiers_str} - ${item.price * item.quantity:.2f}\n"
         summary += f"Total: ${self.cart.total:.2f}"
+        self._cart_summary_cache = summary
         return summary
     
     async def update_agent_cart(self):
-        """Send updated cart state to the agent"""
+        """Send updated cart state to the agent, coalescing updates requested mid-send"""
+        if self._agent_update_pending:
+            # The in-flight update resends once it finishes, with the latest cart
+            self._agent_update_dirty = True
+            return
+        
+        self._agent_update_pending = True
+        try:
+            while True:
+                self._agent_update_dirty = False
+                await self._send_agent_cart()
+                if not self._agent_update_dirty:
+                    break
+        finally:
+            self._agent_update_pending = False
+    
+    async def _send_agent_cart(self):
+        """Send the current cart state to the agent"""
         try:
             if self.websocket and self.is_connected:
                 cart_summary = self._get_cart_summary()
@@ -694,7 +1005,7 @@ LATTE $3.49
                     "type": "system_message",
                     "content": f"Updated cart state:\n{cart_summary}\n\nPlease reference this cart when responding to the user."
                 }
-                await self.websocket.send(json.dumps(update_message))
+                await self.websocket.send(_json_dumps(update_message))
                 logger.info(f"📤 Sent cart update to agent")
         except Exception as e:
             logger.error(f"Error updating agent cart: {e}")
@@ -721,9 +1032,9 @@ LATTE $3.49
             
             # Just emit current cart to keep UI in sync
             socketio.emit('cart_update', {
-                'cart': self.cart.to_dict(),
+                'cart': self.cart_dict(),
                 'session_id': self.session_id
-            })
+            }, to=self.room_id)
             
         except Exception as e:
             logger.error(f"❌ Error checking agent response: {e}")
@@ -750,22 +1061,22 @@ LATTE $3.49
                 # Find SKU from menu
                 sku = None
                 for menu_item in self.menu.items:
-                    if menu_item.name == item_data['name']:
+                    if menu_item.name == item_data.name:
                         sku = menu_item.sku
                         break
                 
                 if sku:
-                    key = (sku, item_data['size'], tuple(sorted(item_data['modifiers'])))
+                    key = (sku, item_data.size, tuple(sorted(item_data.modifiers)))
                     if key in expected_cart:
-                        expected_cart[key]['quantity'] += item_data['quantity']
+                        expected_cart[key]['quantity'] += item_data.quantity
                     else:
                         expected_cart[key] = {
                             'sku': sku,
-                            'name': item_data['name'],
-                            'quantity': item_data['quantity'],
-                            'price': item_data['price'],
-                            'size': item_data['size'],
-                            'modifiers': item_data['modifiers']
+                            'name': item_data.name,
+                            'quantity': item_data.quantity,
+                            'price': item_data.price,
+                            'size': item_data.size,
+                            'modifiers': list(item_data.modifiers)
                         }
             
             # Create current cart map for comparison
@@ -821,6 +1132,7 @@ LATTE $3.49
                 
                 # Replace cart
                 self.cart = new_cart
+                self.cart_changed()
                 
                 logger.info(f"📊 Cart synced from agent recap: {len(self.cart.items)} items, total: ${self.cart.total:.2f}")
                 
@@ -829,9 +1141,9 @@ LATTE $3.49
                 
                 # Emit cart update
                 socketio.emit('cart_update', {
-                    'cart': self.cart.to_dict(),
+                    'cart': self.cart_dict(),
                     'session_id': self.session_id
-                })
+                }, to=self.room_id)
             else:
                 logger.info("✅ Cart matches agent recap - no sync needed")
                 
@@ -842,25 +1154,20 @@ LATTE $3.49
     
     def _is_full_order_recap(self, text: str) -> bool:
         """Check if text contains a full order recap"""
-        text_lower = text.lower()
-        recap_indicators = [
-            "so to recap", "to recap", "let me recap", "your order", 
-            "you've got", "so now you've got", "that's", "your total"
-        ]
-        return any(indicator in text_lower for indicator in recap_indicators)
-
-# Create async loop for WebSocket handling
-def run_async_in_thread(coro):
-    """Run async coroutine in a separate thread"""
-    def run():
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(coro)
-        loop.close()
-    
-    thread = threading.Thread(target=run)
-    thread.start()
-    return thread
+        return next(_RECAP_INDICATORS.iter(text.lower()), None) is not None
+
+
+async def _disconnect_all(sessions):
+    """Disconnect sessions concurrently, logging (not raising) individual failures"""
+    results = await asyncio.gather(*(s.disconnect() for s in sessions), return_exceptions=True)
+    for ultravox_session, result in zip(sessions, results):
+        if isinstance(result, Exception):
+            logger.warning(f"⚠️ Error disconnecting session {ultravox_session.session_id}: {result}")
+
+
+def schedule_disconnect(*sessions):
+    """Tear sessions down on the shared session loop; returns a concurrent Future"""
+    return asyncio.run_coroutine_threadsafe(_disconnect_all(sessions), get_session_loop())
 
 @app.route('/')
 def index():
@@ -889,10 +1196,13 @@ def debug_sessions():
     current_flask_session = dict(session)
     session_id = session.get('session_id')
     
+    # One snapshot, so the id list, details and count agree with each other
+    snapshot = user_sessions.items()
+    
     return jsonify({
         "current_flask_session": current_flask_session,
         "session_id_from_flask": session_id,
-        "active_sessions": list(user_sessions.keys()),
+        "active_sessions": [sid for sid, _ in snapshot],
         "session_details": {
             sid: {
                 "menu": getattr(us.menu, 'name', 'unknown'),
@@ -901,9 +1211,41 @@ def debug_sessions():
                 "join_url": us.join_url is not None,
                 "order_history_count": len(us.order_history)
             }
-            for sid, us in user_sessions.items()
+            for sid, us in snapshot
         },
-        "total_sessions": len(user_sessions)
+        "total_sessions": len(snapshot)
+    })
+
+# menu_items payload per menu name; menus don't change while the app runs
+_menu_items_payloads = {}
+
+
+def get_menu_items_payload(menu):
+    """Get the menu's items for the browser, building (and pre-serializing) them on first use"""
+    payload = _menu_items_payloads.get(menu.name)
+    if payload is None:
+        payload = json_fragment([
+            {
+                "sku": item.sku,
+                "name": item.name,
+                "price": item.price,
+                "category": item.category,
+                "aliases": item.aliases
+            }
+            for item in menu.items
+        ])
+        _menu_items_payloads[menu.name] = payload
+    return payload
+
+
+def session_response(session_id: str, menu_name: str, menu, reused: bool):
+    """Build the start_session response around the cached menu items"""
+    return jsonify({
+        "session_id": session_id,
+        "menu": menu_name,
+        "menu_items": get_menu_items_payload(menu),
+        "reused": reused,
+        "connected": reused
     })
 
 @app.route('/api/start_session')
@@ -913,36 +1255,18 @@ def start_session():
     existing_session_id = session.get('session_id')
     menu_name = request.args.get('menu', 'small')
     
-    if existing_session_id and existing_session_id in user_sessions:
-        ultravox_session = user_sessions[existing_session_id]
-        
+    ultravox_session = user_sessions.get(existing_session_id)
+    
+    if ultravox_session is not None:
         # Check if the session is still viable
         if ultravox_session.is_connected:
             logger.info(f"🔄 Reusing existing connected session: {existing_session_id}")
-            return jsonify({
-                "session_id": existing_session_id,
-                "menu": menu_name,
-                "menu_items": [
-                    {
-                        "sku": item.sku,
-                        "name": item.name,
-                        "price": item.price,
-                        "category": item.category,
-                        "aliases": item.aliases
-                    }
-                    for item in ultravox_session.menu.items
-                ],
-                "reused": True,
-                "connected": True
-            })
+            return session_response(existing_session_id, menu_name, ultravox_session.menu, reused=True)
         else:
             # Session exists but not connected, clean it up and create new
             logger.info(f"🧹 Cleaning up disconnected session: {existing_session_id}")
-            try:
-                asyncio.run(ultravox_session.disconnect())
-            except:
-                pass
-            del user_sessions[existing_session_id]
+            schedule_disconnect(ultravox_session)
+            user_sessions.pop(existing_session_id)
     
     # Clean up any old sessions that might be disconnected
     cleanup_old_sessions()
@@ -953,54 +1277,35 @@ def start_session():
     # Create new Ultravox session
     ultravox_session = UltravoxVoiceSession(session_id, menu_name)
     user_sessions[session_id] = ultravox_session
+    with _unconnected_sessions_lock:
+        _unconnected_sessions.append((time.monotonic(), session_id))
     
     session['session_id'] = session_id
     
     logger.info(f"➕ Created new session: {session_id}, Total sessions: {len(user_sessions)}")
     
-    return jsonify({
-        "session_id": session_id,
-        "menu": menu_name,
-        "menu_items": [
-            {
-                "sku": item.sku,
-                "name": item.name,
-                "price": item.price,
-                "category": item.category,
-                "aliases": item.aliases
-            }
-            for item in ultravox_session.menu.items
-        ],
-        "reused": False,
-        "connected": False
-    })
+    return session_response(session_id, menu_name, ultravox_session.menu, reused=False)
 
 @app.route('/api/connect_ultravox', methods=['POST'])
 def connect_ultravox():
     """Connect to Ultravox WebSocket"""
     session_id = session.get('session_id')
     
-    if not session_id or session_id not in user_sessions:
+    ultravox_session = user_sessions.get(session_id)
+    if ultravox_session is None:
         return jsonify({"error": "No active session"}), 400
     
-    ultravox_session = user_sessions[session_id]
-    
-    # Run async connection in background
-    def connect_async():
-        async def run():
-            success = await ultravox_session.connect_websocket()
-            socketio.emit('ultravox_connection', {
-                'success': success,
-                'session_id': session_id
-            })
-        
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(run())
-        loop.close()
+    # Connect on the shared session loop and report back when it finishes
+    def connected(future):
+        socketio.emit('ultravox_connection', {
+            'success': future.result(),
+            'session_id': session_id
+        }, to=ultravox_session.room_id)
     
-    thread = threading.Thread(target=connect_async)
-    thread.start()
+    asyncio.run_coroutine_threadsafe(
+        ultravox_session.connect_websocket(),
+        ultravox_session._loop
+    ).add_done_callback(connected)
     
     return jsonify({"success": True, "message": "Connecting to Ultravox..."})
 
@@ -1009,35 +1314,26 @@ def send_audio():
     """Send audio data to Ultravox"""
     session_id = session.get('session_id')
     
-    if not session_id or session_id not in user_sessions:
+    ultravox_session = user_sessions.get(session_id)
+    if ultravox_session is None:
         return jsonify({"error": "No active session"}), 400
     
-    ultravox_session = user_sessions[session_id]
-    
     if not ultravox_session.is_connected:
         return jsonify({"error": "Not connected to Ultravox"}), 400
     
-    # Get audio data from request
-    audio_data = request.get_json().get('audio_data')
-    if not audio_data:
-        return jsonify({"error": "No audio data provided"}), 400
-    
     try:
-        # Decode base64 audio data
-        audio_bytes = base64.b64decode(audio_data)
-        
-        # Send to Ultravox in background
-        def send_async():
-            async def run():
-                await ultravox_session.send_audio(audio_bytes)
-            
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(run())
-            loop.close()
+        if request.mimetype == 'application/octet-stream':
+            # Raw PCM body: no JSON parse or base64 decode needed
+            audio_bytes = request.get_data(cache=False)
+        else:
+            # JSON body with base64 audio_data
+            audio_data = request.get_json().get('audio_data')
+            audio_bytes = base64.b64decode(audio_data) if audio_data else b""
+        if not audio_bytes:
+            return jsonify({"error": "No audio data provided"}), 400
         
-        thread = threading.Thread(target=send_async)
-        thread.start()
+        # Hand off to the session's audio queue (the session loop does the send)
+        ultravox_session.send_audio(audio_bytes)
         
         return jsonify({"success": True})
         
@@ -1050,13 +1346,12 @@ def get_cart():
     """Get current cart state"""
     session_id = session.get('session_id')
     
-    if not session_id or session_id not in user_sessions:
+    ultravox_session = user_sessions.get(session_id)
+    if ultravox_session is None:
         return jsonify({"error": "No active session"}), 400
     
-    ultravox_session = user_sessions[session_id]
-    
     return jsonify({
-        "cart": ultravox_session.cart.to_dict(),
+        "cart": ultravox_session.cart_dict(),
         "history": ultravox_session.order_history
     })
 
@@ -1065,23 +1360,21 @@ def clear_cart():
     """Clear the current cart"""
     session_id = session.get('session_id')
     
-    if not session_id or session_id not in user_sessions:
+    ultravox_session = user_sessions.get(session_id)
+    if ultravox_session is None:
         return jsonify({"error": "No active session"}), 400
-    
-    ultravox_session = user_sessions[session_id]
     ultravox_session.clear_cart()
     
-    return jsonify({"success": True, "cart": ultravox_session.cart.to_dict()})
+    return jsonify({"success": True, "cart": ultravox_session.cart_dict()})
 
 @app.route('/api/confirm_order', methods=['POST'])
 def confirm_order():
     """Confirm the current order and start fresh session"""
     session_id = session.get('session_id')
     
-    if not session_id or session_id not in user_sessions:
+    ultravox_session = user_sessions.get(session_id)
+    if ultravox_session is None:
         return jsonify({"error": "No active session"}), 400
-    
-    ultravox_session = user_sessions[session_id]
     result = ultravox_session.confirm_order()
     
     if result["success"]:
@@ -1091,21 +1384,18 @@ def confirm_order():
             'message': result["message"],
             'order': result["order"],
             'session_id': session_id
-        })
+        }, to=ultravox_session.room_id)
         
         # Emit order history update
         socketio.emit('order_history_update', {
             'history': ultravox_session.order_history,
             'session_id': session_id
-        })
+        }, to=ultravox_session.room_id)
         
         # Disconnect from current Ultravox session to prepare for new order
-        try:
-            asyncio.run(ultravox_session.disconnect())
-            ultravox_session.is_connected = False
-            logger.info(f"🔄 Disconnected session {session_id} after order confirmation")
-        except Exception as e:
-            logger.warning(f"⚠️ Error disconnecting session after order: {e}")
+        ultravox_session.is_connected = False
+        schedule_disconnect(ultravox_session)
+        logger.info(f"🔄 Disconnecting session {session_id} after order confirmation")
         
         return jsonify(result)
     else:
@@ -1115,8 +1405,9 @@ def confirm_order():
 def update_item_quantity():
     """Update quantity of a specific item in cart"""
     session_id = session.get('session_id')
+    ultravox_session = user_sessions.get(session_id)
     
-    if not session_id or session_id not in user_sessions:
+    if ultravox_session is None:
         return jsonify({"error": "No active session"}), 400
     
     data = request.get_json()
@@ -1126,29 +1417,27 @@ def update_item_quantity():
     if item_index is None or new_quantity is None:
         return jsonify({"error": "Missing item_index or quantity"}), 400
     
-    ultravox_session = user_sessions[session_id]
-    
     try:
         if 0 <= item_index < len(ultravox_session.cart.items):
+            item = ultravox_session.cart.items[item_index]
             if new_quantity <= 0:
                 # Remove item if quantity is 0 or less
-                removed_item = ultravox_session.cart.items.pop(item_index)
-                logger.info(f"🗑️ Removed item: {removed_item.name}")
+                ultravox_session.cart.remove_item(item_index)
+                logger.info("🗑️ Removed item: %s", item.name)
             else:
-                # Update quantity
-                ultravox_session.cart.items[item_index].quantity = new_quantity
-                logger.info(f"🔄 Updated quantity: {ultravox_session.cart.items[item_index].name} = {new_quantity}")
-            
-            # Recalculate total
-            ultravox_session.cart.total = sum(item.price * item.quantity for item in ultravox_session.cart.items)
+                # Update quantity, adjusting the total by the difference
+                ultravox_session.cart.total += item.price * (new_quantity - item.quantity)
+                item.quantity = new_quantity
+                logger.info("🔄 Updated quantity: %s = %s", item.name, new_quantity)
+            ultravox_session.cart_changed()
             
             # Emit update
             socketio.emit('cart_update', {
-                'cart': ultravox_session.cart.to_dict(),
+                'cart': ultravox_session.cart_dict(),
                 'session_id': session_id
-            })
+            }, to=ultravox_session.room_id)
             
-            return jsonify({"success": True, "cart": ultravox_session.cart.to_dict()})
+            return jsonify({"success": True, "cart": ultravox_session.cart_dict()})
         else:
             return jsonify({"error": "Invalid item index"}), 400
             
@@ -1168,18 +1457,18 @@ def get_order_history():
             "current_cart": {"items": [], "total": 0.0}
         })
     
-    if session_id not in user_sessions:
+    ultravox_session = user_sessions.get(session_id)
+    if ultravox_session is None:
         # If session doesn't exist in memory, return empty history
         return jsonify({
             "history": [],
             "current_cart": {"items": [], "total": 0.0}
         })
     
-    ultravox_session = user_sessions[session_id]
-    
+    # Confirmed orders never change, so each was serialized once in confirm_order
     return jsonify({
-        "history": ultravox_session.order_history,
-        "current_cart": ultravox_session.cart.to_dict()
+        "history": ultravox_session.order_history_payload,
+        "current_cart": ultravox_session.cart_dict()
     })
 
 @app.route('/api/process_transcript', methods=['POST'])
@@ -1188,31 +1477,30 @@ def process_transcript():
     data = request.get_json()
     session_id = data.get('session_id') or session.get('session_id')
     transcript = data.get('transcript', '')
+    ultravox_session = user_sessions.get(session_id)
     
-    if not session_id or session_id not in user_sessions:
+    if ultravox_session is None:
         return jsonify({"error": "No active session"}), 400
     
     if not transcript:
         return jsonify({"error": "No transcript provided"}), 400
     
-    ultravox_session = user_sessions[session_id]
-    
     try:
-        # Import NLP processor
-        from nlp_processor import NLPProcessor
-        
-        # Create NLP processor for this session
-        nlp = NLPProcessor(ultravox_session.menu)
+        # Use the session's NLP processor (shared per menu via get_nlp_processor; holds no per-session state)
+        nlp = ultravox_session.nlp
         
         # Detect intent
         intent, confidence = nlp.detect_intent(transcript)
         
-        logger.info(f"🔍 Detected intent: {intent} (confidence: {confidence:.2f})")
+        logger.info("🔍 Detected intent: %s (confidence: %.2f)", intent, confidence)
         
         if intent == "remove":
             # Handle remove operation
-            logger.info(f"➖ Processing remove operation...")
+            logger.debug("➖ Processing remove operation...")
             result = nlp.process_cart_operation(transcript, ultravox_session.cart)
+            # NLP removals drop cart lines without tracking the total
+            ultravox_session.cart.total = sum(item.price * item.quantity for item in ultravox_session.cart.items)
+            ultravox_session.cart_changed()
             
             if result['success']:
                 message = result['message']
@@ -1221,94 +1509,60 @@ def process_transcript():
                 
         elif intent == "add":
             # Handle add operation using existing cart normalizer
-            logger.info(f"➕ Processing add operation...")
+            logger.debug("➕ Processing add operation...")
             new_items_cart = ultravox_session.cart_normalizer.parse_order(transcript)
             
             # Merge new items with existing cart
-            for new_item in new_items_cart.items:
-                # Check if item already exists in cart
-                existing_item = None
-                for existing in ultravox_session.cart.items:
-                    if (existing.name == new_item.name and 
-                        existing.size == new_item.size and 
-                        set(existing.modifiers) == set(new_item.modifiers)):
-                        existing_item = existing
-                        break
-                
-                if existing_item:
-                    # Increase quantity of existing item
-                    existing_item.quantity += new_item.quantity
-                    logger.info(f"🔄 Updated existing item: {existing_item.name} (quantity: {existing_item.quantity})")
-                else:
-                    # Add new item to cart
-                    ultravox_session.cart.items.append(new_item)
-                    logger.info(f"➕ Added new item: {new_item.name} (quantity: {new_item.quantity})")
+            ultravox_session.merge_items(new_items_cart.items)
             
             message = "Item added successfully"
             
         elif intent == "query":
             # Handle query operation
-            logger.info(f"❓ Processing query operation...")
+            logger.debug("❓ Processing query operation...")
             result = nlp.process_cart_operation(transcript, ultravox_session.cart)
             message = result['message']
             
         elif intent == "confirm":
             # Handle confirm operation
-            logger.info(f"✅ Processing confirm operation...")
+            logger.debug("✅ Processing confirm operation...")
             message = "Order confirmed"
             
         elif intent == "cancel":
             # Handle cancel operation
-            logger.info(f"❌ Processing cancel operation...")
+            logger.debug("❌ Processing cancel operation...")
             ultravox_session.clear_cart()
             message = "Order cancelled"
             
         else:
             # Unknown intent - try to parse as add
-            logger.info(f"❓ Unknown intent, attempting to parse as add...")
+            logger.debug("❓ Unknown intent, attempting to parse as add...")
             new_items_cart = ultravox_session.cart_normalizer.parse_order(transcript)
             
             if new_items_cart.items:
-                for new_item in new_items_cart.items:
-                    existing_item = None
-                    for existing in ultravox_session.cart.items:
-                        if (existing.name == new_item.name and 
-                            existing.size == new_item.size and 
-                            set(existing.modifiers) == set(new_item.modifiers)):
-                            existing_item = existing
-                            break
-                    
-                    if existing_item:
-                        existing_item.quantity += new_item.quantity
-                        logger.info(f"🔄 Updated existing item: {existing_item.name} (quantity: {existing_item.quantity})")
-                    else:
-                        ultravox_session.cart.items.append(new_item)
-                        logger.info(f"➕ Added new item: {new_item.name} (quantity: {new_item.quantity})")
+                ultravox_session.merge_items(new_items_cart.items)
             
             message = "Item processed"
         
-        # Recalculate total
-        ultravox_session.cart.total = sum(item.price * item.quantity for item in ultravox_session.cart.items)
-        
         # Emit cart update to web client
         socketio.emit('cart_update', {
-            'cart': ultravox_session.cart.to_dict(),
+            'cart': ultravox_session.cart_dict(),
             'session_id': session_id
-        })
+        }, to=ultravox_session.room_id)
         
         # Send cart update to agent to keep it in sync
-        if ultravox_session._loop and ultravox_session.is_connected:
+        if ultravox_session.is_connected:
             asyncio.run_coroutine_threadsafe(
                 ultravox_session.update_agent_cart(),
                 ultravox_session._loop
             )
         
-        logger.info(f"📊 Updated cart for session {session_id}: {len(ultravox_session.cart.items)} items, total: ${ultravox_session.cart.total:.2f}")
+        logger.info("📊 Updated cart for session %s: %d items, total: $%.2f", session_id, len(ultravox_session.cart.items), ultravox_session.cart.total)
         
         return jsonify({
             "success": True,
             "message": message,
-            "cart": ultravox_session.cart.to_dict()
+            "cart": ultravox_session.cart_dict()
         })
         
     except Exception as e:
@@ -1321,12 +1575,11 @@ def process_transcript():
 def reset_sessions():
     """Reset all sessions and clean up connections"""
     try:
-        # Disconnect all sessions
-        for session_id, ultravox_session in list(user_sessions.items()):
-            try:
-                asyncio.run(ultravox_session.disconnect())
-            except:
-                pass
+        # Disconnect all sessions together on the session loop
+        try:
+            schedule_disconnect(*user_sessions.values()).result(timeout=5.0)
+        except concurrent.futures.TimeoutError:
+            logger.warning("⚠️ Timed out waiting for sessions to disconnect")
             
         # Clear all sessions
         user_sessions.clear()
@@ -1360,6 +1613,18 @@ def handle_disconnect():
     """Handle client disconnection"""
     logger.info(f"Client disconnected: {request.sid}")
 
+@socketio.on('join_session')
+def handle_join_session(data):
+    """Scope a session's cart and voice events to the browser that owns it"""
+    session_id = data.get('session_id')
+    ultravox_session = user_sessions.get(session_id)
+    if ultravox_session is None:
+        emit('error', {'msg': f'Session {session_id} not found. Please refresh and try again.'})
+        return
+    
+    join_room(session_id)
+    ultravox_session.room_id = session_id
+
 @socketio.on('start_ultravox')
 def handle_start_ultravox(data):
     """Handle request to start Ultravox connection"""
@@ -1367,32 +1632,32 @@ def handle_start_ultravox(data):
     session_id = data.get('session_id')
     
     logger.info(f"🚀 Received start_ultravox request for session: {session_id}")
-    logger.info(f"📊 Available sessions: {list(user_sessions.keys())}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"📊 Available sessions: {user_sessions.keys()}")
     
-    if not session_id or session_id not in user_sessions:
+    ultravox_session = user_sessions.get(session_id)
+    if ultravox_session is None:
         error_msg = f'❌ No active session found for {session_id}. Available sessions: {list(user_sessions.keys())}'
         logger.error(error_msg)
         emit('error', {'msg': error_msg})
         return
     
-    ultravox_session = user_sessions[session_id]
+    # Scope this session's events to the requesting browser
+    join_room(session_id)
+    ultravox_session.room_id = session_id
     
     emit('status', {'msg': '🔄 Connecting to Ultravox...'})
     
-    # Run async connection in background thread with proper error handling
-    def connect_async():
+    async def run():
+        logger.info(f"🎯 Attempting WebSocket connection for {session_id}")
+        success = await ultravox_session.connect_websocket()
+        logger.info(f"📡 Connection result for {session_id}: {success}")
+        return success
+    
+    # Emit the connection result once it completes (runs on the session loop thread)
+    def connected(future):
         try:
-            logger.info(f"🔧 Starting connection thread for session {session_id}")
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            async def run():
-                logger.info(f"🎯 Attempting WebSocket connection for {session_id}")
-                success = await ultravox_session.connect_websocket()
-                logger.info(f"📡 Connection result for {session_id}: {success}")
-                return success
-            
-            success = loop.run_until_complete(run())
+            success = future.result()
             
             logger.info(f"✅ Ultravox connection result for {session_id}: {success}")
             
@@ -1403,24 +1668,22 @@ def handle_start_ultravox(data):
                         'success': True,
                         'session_id': session_id,
                         'message': 'Connected to Ultravox! You can now start speaking.'
-                    })
+                    }, to=ultravox_session.room_id)
                 else:
                     socketio.emit('error', {
                         'msg': 'Failed to connect to Ultravox. Please try again.'
-                    })
+                    }, to=ultravox_session.room_id)
                 
         except Exception as e:
-            logger.error(f"💥 Error in connect_async for {session_id}: {e}")
+            logger.error(f"💥 Error connecting session {session_id}: {e}")
             with app.app_context():
-                socketio.emit('error', {'msg': f'Connection failed: {str(e)}'})
-        finally:
-            if 'loop' in locals():
-                loop.close()
-                logger.info(f"🔚 Closed event loop for session {session_id}")
+                socketio.emit('error', {'msg': f'Connection failed: {str(e)}'}, to=ultravox_session.room_id)
     
-    thread = threading.Thread(target=connect_async, daemon=True)
-    thread.start()
-    logger.info(f"🧵 Started connection thread for session {session_id}")
+    asyncio.run_coroutine_threadsafe(run(), ultravox_session._loop).add_done_callback(connected)
+    logger.info(f"🧵 Scheduled connection for session {session_id}")
+
+# Audio chunks received over Socket.IO, across all sessions (next() is atomic)
+_audio_chunk_counter = itertools.count(1)
 
 @socketio.on('audio_data')
 def handle_audio_data(data):
@@ -1428,14 +1691,10 @@ def handle_audio_data(data):
     # Get session_id from the data payload
     session_id = data.get('session_id')
     
-    # Debug: Log audio occasionally, not every time
-    if not hasattr(handle_audio_data, 'audio_count'):
-        handle_audio_data.audio_count = 0
-    handle_audio_data.audio_count += 1
-    
-    # Only log every 100th audio chunk
-    if handle_audio_data.audio_count % 100 == 0:
-        logger.info(f"📡 Processed {handle_audio_data.audio_count} audio chunks for session: {session_id}")
+    # Only log every 128th audio chunk
+    audio_count = next(_audio_chunk_counter)
+    if audio_count & 127 == 0:
+        logger.info("📡 Processed %d audio chunks for session: %s", audio_count, session_id)
     
     # Validate session
     if not session_id:
@@ -1443,10 +1702,12 @@ def handle_audio_data(data):
         emit('error', {'msg': 'No session_id provided'})
         return
         
-    if session_id not in user_sessions:
+    ultravox_session = user_sessions.get(session_id)
+    if ultravox_session is None:
         # Try to get from Flask session as fallback
         fallback_session_id = session.get('session_id')
-        if fallback_session_id and fallback_session_id in user_sessions:
+        ultravox_session = user_sessions.get(fallback_session_id)
+        if ultravox_session is not None:
             session_id = fallback_session_id
             logger.info(f"🔄 Using fallback session: {session_id}")
         else:
@@ -1454,8 +1715,6 @@ def handle_audio_data(data):
             emit('error', {'msg': f'Session {session_id} not found. Please refresh and try again.'})
             return
     
-    ultravox_session = user_sessions[session_id]
-    
     if not ultravox_session.is_connected:
         logger.error(f'❌ Session {session_id} not connected to Ultravox')
         emit('error', {'msg': 'Not connected to Ultravox'})
@@ -1478,34 +1737,24 @@ def handle_audio_data(data):
         emit('error', {'msg': f'Error processing audio: {str(e)}'})
 
 def cleanup_old_sessions():
-    """Clean up old disconnected sessions"""
-    to_remove = []
-    for session_id, ultravox_session in user_sessions.items():
-        try:
-            # Check if session is still viable
-            if not ultravox_session.is_connected and ultravox_session.join_url is None:
-                logger.info(f"🧹 Marking session for cleanup: {session_id}")
-                to_remove.append(session_id)
-            elif not ultravox_session.is_connected:
-                # Try to reconnect if we have a join_url
-                logger.info(f"⚠️ Session {session_id} has join_url but not connected")
-        except Exception as e:
-            logger.warning(f"⚠️ Error checking session {session_id}: {e}")
-            to_remove.append(session_id)
-    
-    # Remove old sessions
-    for session_id in to_remove:
-        try:
-            if session_id in user_sessions:
-                ultravox_session = user_sessions[session_id]
-                asyncio.run(ultravox_session.disconnect())
-                del user_sessions[session_id]
-                logger.info(f"🗑️ Cleaned up session: {session_id}")
-        except Exception as e:
-            logger.warning(f"⚠️ Error cleaning up session {session_id}: {e}")
-    
-    if to_remove:
-        logger.info(f"🧹 Cleaned up {len(to_remove)} old sessions, {len(user_sessions)} remaining")
+    """Clean up sessions that never got an Ultravox call, oldest first"""
+    cutoff = time.monotonic() - SESSION_CONNECT_GRACE
+    removed = []
+    with _unconnected_sessions_lock:
+        # Only sessions past the grace period are looked at, so this stops at the first young one
+        while _unconnected_sessions and _unconnected_sessions[0][0] <= cutoff:
+            _, session_id = _unconnected_sessions.popleft()
+            ultravox_session = user_sessions.get(session_id)
+            if ultravox_session is None or ultravox_session.is_connected or ultravox_session.join_url is not None:
+                continue
+            logger.info(f"🧹 Marking session for cleanup: {session_id}")
+            user_sessions.pop(session_id)
+            removed.append(ultravox_session)
+    
+    # Disconnect removed sessions together on the session loop
+    if removed:
+        schedule_disconnect(*removed)
+        logger.info(f"🧹 Cleaned up {len(removed)} old sessions, {len(user_sessions)} remaining")
 
 if __name__ == '__main__':
     # Set up environment